@@ -78,6 +78,9 @@ class AutoReportScreen(QWidget):
         self.mode_switch.stateChanged.connect(self.on_mode_changed)
         form_layout.addRow("Append mode:", self.mode_switch)
 
+        self.summary_only_checkbox = QCheckBox("Только сводная таблица (без скриншотов)")
+        form_layout.addRow("", self.summary_only_checkbox)
+
         self.music_checkbox = QCheckBox("Включить фоновую музыку")
         form_layout.addRow("", self.music_checkbox)
 
@@ -149,6 +152,7 @@ class AutoReportScreen(QWidget):
             "space": self.space_edit.text().strip(),
             "parent_id": self.parent_id_edit.text().strip(),
             "append_mode": self.mode_switch.isChecked(),
+            "summary_only": self.summary_only_checkbox.isChecked(),
             "background_music": self.music_checkbox.isChecked()
         }
 
@@ -4,11 +4,18 @@ from PyQt6.QtWidgets import QVBoxLayout, QLabel, QHBoxLayout, QWidget, QPushButt
     QInputDialog, QLineEdit, QDialogButtonBox, QTextEdit, QDialog, QFormLayout, QDateTimeEdit
 
 import json
+import re
 from config import config
+from service.reflex_bulk_service import ReflexBulkService
 from service.reflex_transfer_service import reflex_service
 from workers.reflex_worker import ReflexWorker
 
 
+# Несколько кодов ФП через запятую, точку с запятой или пробел
+def parse_fp_codes(text: str) -> list:
+    return list(dict.fromkeys(code for code in re.split(r'[\s,;]+', text.strip()) if code))
+
+
 # --- Диалог для показа JSON-ответа ---
 class JsonResponseDialog(QDialog):
     def __init__(self, title: str, response: dict, parent=None):
@@ -45,7 +52,7 @@ class TransferFromToDialog(QDialog):
         layout = QFormLayout(self)
 
         self.fp_code_edit = QLineEdit()
-        self.fp_code_edit.setPlaceholderText("VAT, BUDGET и т.д.")
+        self.fp_code_edit.setPlaceholderText("VAT, BUDGET и т.д. (можно несколько через запятую)")
 
         self.from_dt = QDateTimeEdit()
         self.from_dt.setCalendarPopup(True)
@@ -67,7 +74,7 @@ class TransferFromToDialog(QDialog):
         layout.addRow(buttons)
 
     def get_values(self):
-        fp_code = self.fp_code_edit.text().strip()
+        fp_codes = parse_fp_codes(self.fp_code_edit.text())
 
         # Получаем QDateTime из виджетов
         from_qdt = self.from_dt.dateTime()
@@ -77,7 +84,7 @@ class TransferFromToDialog(QDialog):
         from_ms = int(from_qdt.toMSecsSinceEpoch())
         to_ms = int(to_qdt.toMSecsSinceEpoch())
 
-        return fp_code, from_ms, to_ms
+        return fp_codes, from_ms, to_ms
 
 # Screen с кнопками для взаимодействия с приложением reflex-transfer
 class ReflexTransferScreen(QWidget):
@@ -85,6 +92,7 @@ class ReflexTransferScreen(QWidget):
         super().__init__(parent)
         self.parent_window = parent
         self.threadpool = QThreadPool()
+        self.bulk_service = ReflexBulkService(reflex_service)
         self.buttons = {}
 
         self.dot_count = 0  # Текущее количество точек
@@ -255,6 +263,11 @@ class ReflexTransferScreen(QWidget):
 
         if action_name == "Получить все активные трансферы":
             JsonResponseDialog("Активные трансферы", response, self).exec()
+        elif "results" in response:
+            # Массовая операция: результат и время по каждому ФП
+            failed = [result["namespace"] for result in response["results"] if not result["success"]]
+            self.status_label.setText(f"{action_name}: ошибки для {', '.join(failed)}" if failed else "Выберите действие")
+            JsonResponseDialog(action_name, response, self).exec()
         else:
             QMessageBox.information(
                 self, "Успех",
@@ -268,35 +281,41 @@ class ReflexTransferScreen(QWidget):
         self.status_label.setText("Выберите действие")
         QMessageBox.critical(self, "Ошибка", f"<b>{action_name}</b><br><br>{error_msg}")
 
+    # Несколько ФП — параллельно через ReflexBulkService, ответ {"results": [...]}
+    def run_for_fp_codes(self, single_func, bulk_func, action_name: str, fp_codes: list):
+        if len(fp_codes) == 1:
+            self.run_action(single_func, action_name, fp_codes[0])
+        else:
+            self.run_action(lambda codes: {"results": bulk_func(codes)}, action_name, fp_codes)
+
     # === Методы сервиса reflex_transfer_service === Требуется изменить для правильной работы
     def create_regular_transfer_action(self):
-        fp_code, ok = QInputDialog.getText(self, "Создать трансфер", "Введите КОД ФП:")
-        if ok and fp_code.strip():
-            self.run_action(reflex_service.send_create_transfer_request,
-                            "Создать трансфер",
-                            fp_code)
+        fp_code, ok = QInputDialog.getText(self, "Создать трансфер", "Введите КОД ФП (можно несколько через запятую):")
+        if ok and parse_fp_codes(fp_code):
+            self.run_for_fp_codes(reflex_service.send_create_transfer_request, self.bulk_service.create_transfers,
+                                  "Создать трансфер", parse_fp_codes(fp_code))
         elif ok:
             QMessageBox.warning(self, "Ошибка", "Код ФП обязателен")
 
     def create_transfer_from_to_action(self):
         dialog = TransferFromToDialog(self)
         if dialog.exec() == QDialog.DialogCode.Accepted:
-            fp_code, from_ms, to_ms = dialog.get_values()
-            if not fp_code:
+            fp_codes, from_ms, to_ms = dialog.get_values()
+            if not fp_codes:
                 QMessageBox.warning(self, "Ошибка", "Код ФП обязателен")
                 return
+            # Длинное окно делится на параллельные подынтервалы (Reflex_backfill_chunk_hours)
             self.run_action(
-                reflex_service.send_start_transfer_from_to_request,
+                lambda codes, start, end: {"results": self.bulk_service.transfer_from_to(codes, start, end)},
                 "Трансфер From-To",
-                fp_code, from_ms, to_ms
+                fp_codes, from_ms, to_ms
             )
 
     def stop_regular_transfer_action(self):
-        fp_code, ok = QInputDialog.getText(self, "Остановить трансфер", "Введите КОД ФП:")
-        if ok and fp_code.strip():
-            self.run_action(reflex_service.send_stop_transfer_request,
-                            "Остановить трансфер",
-                            fp_code)
+        fp_code, ok = QInputDialog.getText(self, "Остановить трансфер", "Введите КОД ФП (можно несколько через запятую):")
+        if ok and parse_fp_codes(fp_code):
+            self.run_for_fp_codes(reflex_service.send_stop_transfer_request, self.bulk_service.stop_transfers,
+                                  "Остановить трансфер", parse_fp_codes(fp_code))
         elif ok:
             QMessageBox.warning(self, "Ошибка", "Код ФП обязателен")
 
@@ -305,13 +324,13 @@ class ReflexTransferScreen(QWidget):
                         "Получить все активные трансферы")
 
     def delete_instances_action(self):
-        fp_code, ok = QInputDialog.getText(self, "Удалить инстансы ФП", "Введите КОД ФП:")
-        if ok and fp_code.strip():
-            reply = QMessageBox.question(self, "Подтверждение", f"Удалить инстансы для {fp_code}?", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        fp_code, ok = QInputDialog.getText(self, "Удалить инстансы ФП", "Введите КОД ФП (можно несколько через запятую):")
+        if ok and parse_fp_codes(fp_code):
+            fp_codes = parse_fp_codes(fp_code)
+            reply = QMessageBox.question(self, "Подтверждение", f"Удалить инстансы для {', '.join(fp_codes)}?", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
             if reply == QMessageBox.StandardButton.Yes:
-                self.run_action(reflex_service.send_delete_instance_request,
-                                "Удалить инстансы ФП",
-                                fp_code)
+                self.run_for_fp_codes(reflex_service.send_delete_instance_request, self.bulk_service.delete_instances,
+                                      "Удалить инстансы ФП", fp_codes)
         elif ok:
             QMessageBox.warning(self, "Ошибка", "Код ФП обязателен")
 
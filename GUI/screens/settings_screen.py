@@ -3,7 +3,7 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QLineEdit,
     QPushButton, QHBoxLayout, QFormLayout, QMessageBox,
-    QSpacerItem, QSizePolicy
+    QSpacerItem, QSizePolicy, QComboBox
 )
 from PyQt6.QtCore import Qt
 from config import config
@@ -52,10 +52,18 @@ class SettingsScreen(QWidget):
             "reflex_transfer_url": "Reflex Transfer URL",
         }
 
+        # Параметры с фиксированным набором значений
+        left_choices = {
+            "Grafana_render_backend": ("Grafana Render Backend", ["threads", "async", "native"]),
+            "Native_downsample": ("Native Downsample", ["mean", "minmax", "lttb"]),
+            "Native_fallback": ("Native Fallback", ["grafana", "skip"]),
+        }
+
         right_params = {
             "Confluence_url": "Confluence URL",
             "Confluence_api_token": "Confluence API Token",
             "Confluence_username": "Confluence Username",
+            "Confluence_page_id_conf": "Confluence Config Page ID",
             "Influxdb_url": "InfluxDB URL",
             "Influxdb_port": "InfluxDB Port",
             "Influxdb_username": "InfluxDB Username",
@@ -64,10 +72,13 @@ class SettingsScreen(QWidget):
         }
 
         self.edit_widgets = {}
+        self.choice_widgets = {}
 
         # Заполняем левую колонку
         for key, label_text in left_params.items():
             self._add_field(left_form, key, label_text)
+        for key, (label_text, options) in left_choices.items():
+            self._add_choice(left_form, key, label_text, options)
 
         # Заполняем правую колонку
         for key, label_text in right_params.items():
@@ -128,6 +139,24 @@ class SettingsScreen(QWidget):
         form_layout.addRow(label, edit)
         self.edit_widgets[key] = edit
 
+    def _add_choice(self, form_layout: QFormLayout, key: str, label_text: str, options: list):
+        """Добавляет выпадающий список для параметра с фиксированным набором значений"""
+        label = QLabel(f"{label_text}:")
+        label.setWordWrap(True)
+        label.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignTop)
+        label.setMinimumWidth(180)
+        label.setMaximumWidth(220)
+
+        combo = QComboBox()
+        combo.addItems(options)
+        combo.setMinimumWidth(250)
+        combo.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+        combo.setCurrentText(config.get_value(key, options[0]))
+        combo.currentTextChanged.connect(lambda text, k=key: config.set_value(k, text))
+
+        form_layout.addRow(label, combo)
+        self.choice_widgets[key] = combo
+
     def reset_all_settings(self):
         reply = QMessageBox.question(
             self,
@@ -141,6 +170,10 @@ class SettingsScreen(QWidget):
                 default = config.defaults.get(key, "")
                 config.set_value(key, default)
                 self.edit_widgets[key].setText(default)
+            for key, combo in self.choice_widgets.items():
+                default = config.defaults.get(key, "")
+                config.set_value(key, default)
+                combo.setCurrentText(default)
 
             QMessageBox.information(self, "Успех", "Настройки сброшены до значений по умолчанию!")
 
@@ -0,0 +1,180 @@
+# benchmarks/bench_pipeline.py
+"""
+End-to-end benchmark of the report pipeline against local stand-ins for Grafana, InfluxDB and Confluence.
+
+Each scale (number of containers) runs ReportPipeline in a fresh subprocess so peak RSS is
+per scale; the stub servers run in this process and record per-request latency per stage.
+
+    python -m benchmarks.bench_pipeline --scales 10 100 1000 --output benchmarks/baseline.json
+    python -m benchmarks.bench_pipeline --scales 10 100 --compare benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.stubs import ConfluenceStub, GrafanaRenderStub, InfluxStub
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NAMESPACE = 'bench'
+
+
+def percentile(values, fraction: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def run_child():
+    """Runs one report in this process with settings from LTTOOLS_* and prints the result as JSON."""
+    from headless_config import HeadlessConfig
+    from workers.report_pipeline import ReportPipeline
+
+    pipeline = ReportPipeline(HeadlessConfig())
+    started = time.perf_counter()
+    try:
+        result = pipeline.run({
+            'fp_code': NAMESPACE.upper(),
+            'test_name': 'Стабильность',
+            'from_dt': '01.01.2025 10:00',
+            'to_dt': '01.01.2025 12:00',
+            'page_name': 'Benchmark report',
+            'space': 'BENCH',
+            'parent_id': '1',
+            'append_mode': False,
+        })
+    finally:
+        pipeline.close()
+    print(json.dumps({
+        'wall_time_s': round(time.perf_counter() - started, 3),
+        'success': result['success'],
+        'screenshots': sum(len(panels) for panels in result['graphics'].values()),
+        'stage_wall_time_s': result['timings'],
+        'peak_rss_mb': peak_rss_mb(),
+    }))
+
+
+def run_scale(containers: int, args) -> dict:
+    grafana = GrafanaRenderStub(args.render_latency, args.render_latency / 2, args.rate_429, args.rate_5xx, args.image_size).start()
+    influx = InfluxStub(containers, args.influx_latency).start()
+    confluence = ConfluenceStub((NAMESPACE,), args.confluence_latency, args.upload_latency).start()
+    workdir = tempfile.mkdtemp(prefix=f"pipeline-bench-{containers}-")
+    os.symlink(os.path.join(REPO_ROOT, 'resources'), os.path.join(workdir, 'resources'))
+    grafana_host, grafana_port = grafana.url.rsplit(':', 1)
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [REPO_ROOT, env.get('PYTHONPATH')]))
+    env.update({f"LTTOOLS_{key}": value for key, value in {
+        'Grafana_host': grafana_host,
+        'Grafana_port': grafana_port,
+        'Grafana_max_workers': str(args.workers),
+        'Grafana_render_backend': args.backend,
+        'Grafana_rate_limit': str(args.rate),
+        'Grafana_cache_max_mb': '0',
+        'Influxdb_url': '127.0.0.1',
+        'Influxdb_port': str(influx.server_port),
+        'Confluence_url': confluence.url,
+        'Confluence_page_id_conf': ConfluenceStub.CONFIG_PAGE_ID,
+    }.items()})
+    try:
+        completed = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_pipeline', '--child'],
+            cwd=workdir, env=env, capture_output=True, text=True, check=False,
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"Benchmark run failed for {containers} containers:\n{completed.stderr[-4000:]}")
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+    finally:
+        for stub in (grafana, influx, confluence):
+            stub.stop()
+
+    stages = {}
+    total_requests = 0
+    for stub in (grafana, influx, confluence):
+        for route, latencies in stub.latencies.items():
+            total_requests += len(latencies)
+            stages[route] = {
+                'requests': len(latencies),
+                'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+                'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+            }
+    result.update(
+        containers=containers,
+        requests=total_requests,
+        requests_per_s=round(total_requests / result['wall_time_s'], 1) if result['wall_time_s'] else None,
+        stages=dict(sorted(stages.items())),
+    )
+    return result
+
+
+def compare(results: dict, baseline_path: str, tolerance: float) -> list:
+    """Returns regressions of wall time and peak RSS against a baseline file."""
+    with open(baseline_path, 'r', encoding='utf-8') as file:
+        baseline = json.load(file)['scales']
+    regressions = []
+    for scale, result in results.items():
+        previous = baseline.get(scale)
+        if not previous:
+            continue
+        for metric in ('wall_time_s', 'peak_rss_mb'):
+            old, new = previous.get(metric), result.get(metric)
+            if old and new and new > old * (1 + tolerance):
+                regressions.append(f"{scale} containers: {metric} {old} -> {new}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--scales', type=int, nargs='+', default=[10, 100, 1000], help='numbers of containers')
+    parser.add_argument('--backend', choices=['threads', 'async'], default='threads')
+    parser.add_argument('--workers', type=int, default=10)
+    parser.add_argument('--rate', type=float, default=1000, help='Grafana_rate_limit, requests per second')
+    parser.add_argument('--render-latency', type=float, default=0.05)
+    parser.add_argument('--rate-429', type=float, default=0.0)
+    parser.add_argument('--rate-5xx', type=float, default=0.0)
+    parser.add_argument('--image-size', type=int, default=60_000)
+    parser.add_argument('--influx-latency', type=float, default=0.01)
+    parser.add_argument('--confluence-latency', type=float, default=0.01)
+    parser.add_argument('--upload-latency', type=float, default=0.02)
+    parser.add_argument('--output', help='write results as a JSON baseline file')
+    parser.add_argument('--compare', help='baseline file to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown before a regression, fraction')
+    args = parser.parse_args()
+
+    if args.child:
+        run_child()
+        return
+
+    results = {str(scale): run_scale(scale, args) for scale in args.scales}
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'params': {key: value for key, value in vars(args).items() if key not in ('child', 'output', 'compare')},
+        'scales': results,
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/bench_render_backends.py
+"""
+Compares the thread-pool and asyncio screenshot backends against a local stub render server.
+
+    python -m benchmarks.bench_render_backends --containers 40 --latency 0.5
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.stubs import GrafanaRenderStub, StaticConfig
+from service.grafana_services.grafana_sceernshot_service import GrafanaScreenshotService
+from service.grafana_services.grafana_async_screenshot_service import AsyncGrafanaScreenshotService
+
+BACKENDS = {
+    'threads': GrafanaScreenshotService,
+    'async': AsyncGrafanaScreenshotService,
+}
+
+
+def run_backend(name: str, stub: GrafanaRenderStub, args) -> dict:
+    host, port = stub.url.rsplit(':', 1)
+    service = BACKENDS[name](StaticConfig({
+        'Grafana_host': host,
+        'Grafana_port': port,
+        'Grafana_dashboard_uid': 'bench',
+        'Grafana_dashboard_slug': 'bench',
+        'Grafana_max_workers': str(args.workers),
+        'Grafana_async_concurrency': str(args.concurrency),
+        'Grafana_rate_limit': str(args.rate),
+        'Grafana_max_retries': '3',
+    }))
+    containers = [f"bench-container-{i}" for i in range(args.containers)]
+    requests_before = stub.request_count()
+    started = time.perf_counter()
+    try:
+        graphics = service.make_screenshots(containers, 'now-1h', 'now', f"bench-{name}")
+    finally:
+        service.close()
+    elapsed = time.perf_counter() - started
+    rendered = sum(len(panels) for panels in graphics.values())
+    requests_made = stub.request_count() - requests_before
+    return {
+        'backend': name,
+        'rendered': rendered,
+        'requests': requests_made,
+        'wall_time_s': round(elapsed, 3),
+        'renders_per_s': round(rendered / elapsed, 2) if elapsed else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--containers', type=int, default=40)
+    parser.add_argument('--latency', type=float, default=0.5, help='mean render latency, seconds')
+    parser.add_argument('--jitter', type=float, default=0.2)
+    parser.add_argument('--rate-429', type=float, default=0.0)
+    parser.add_argument('--rate-5xx', type=float, default=0.0)
+    parser.add_argument('--image-size', type=int, default=60_000)
+    parser.add_argument('--workers', type=int, default=10, help='Grafana_max_workers for the thread backend')
+    parser.add_argument('--concurrency', type=int, default=200, help='Grafana_async_concurrency for the async backend')
+    parser.add_argument('--rate', type=float, default=1000, help='Grafana_rate_limit, requests per second')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), action='append')
+    args = parser.parse_args()
+
+    stub = GrafanaRenderStub(args.latency, args.jitter, args.rate_429, args.rate_5xx, args.image_size).start()
+    workdir = tempfile.mkdtemp(prefix='render-bench-')
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        results = [run_backend(name, stub, args) for name in args.backend or ['threads', 'async']]
+    finally:
+        os.chdir(cwd)
+        stub.stop()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
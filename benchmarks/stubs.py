@@ -0,0 +1,343 @@
+# benchmarks/stubs.py
+
+import itertools
+import json
+import math
+import random
+import re
+import threading
+import time
+import urllib.parse
+from email.parser import BytesParser
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List
+
+from utils.confluence_graphics_sorter import ALL_METRICS_ORDER
+
+PNG_HEADER = b'\x89PNG\r\n\x1a\n'
+
+
+class StubServer(ThreadingHTTPServer):
+    """Threaded HTTP server on a free local port that records per-route latencies."""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, handler_class):
+        super().__init__(('127.0.0.1', 0), handler_class)
+        self.latencies: Dict[str, List[float]] = {}
+        self._stats_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def record(self, route: str, elapsed: float):
+        with self._stats_lock:
+            self.latencies.setdefault(route, []).append(elapsed)
+
+    def request_count(self) -> int:
+        with self._stats_lock:
+            return sum(len(values) for values in self.latencies.values())
+
+    def start(self) -> 'StubServer':
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Keep-alive handler base: quiet logs and a helper for complete responses."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status: int, body: bytes, content_type: str = 'application/json', headers: Dict[str, str] = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def dashboard_model(titles: List[str], version: int = 1) -> dict:
+    """Dashboard JSON with one panel per title; the second half sits in a collapsed row."""
+    half = len(titles) // 2
+    panels = [{'id': i + 1, 'type': 'timeseries', 'title': title} for i, title in enumerate(titles)]
+    row = {'id': 1000, 'type': 'row', 'title': 'JVM', 'collapsed': True, 'panels': panels[half:]}
+    return {'uid': 'bench', 'title': 'Bench', 'version': version, 'panels': panels[:half] + [row]}
+
+
+class GrafanaRenderStub(StubServer):
+    """Simulates Grafana /render/d-solo with configurable latency, 429/5xx rates and image size,
+    plus the dashboard JSON API the panel catalog reads."""
+
+    def __init__(self, latency: float = 0.2, jitter: float = 0.1, rate_429: float = 0.0,
+                 rate_5xx: float = 0.0, image_size: int = 60_000, panel_titles: List[str] = None):
+        super().__init__(GrafanaRenderHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.image = PNG_HEADER + bytes(max(0, image_size - len(PNG_HEADER)))
+        titles = panel_titles or [slug.replace('-', ' ') for slug in ALL_METRICS_ORDER]
+        self.dashboard = dashboard_model(titles)
+
+
+class GrafanaRenderHandler(StubHandler):
+    def do_GET(self):
+        server: GrafanaRenderStub = self.server
+        started = time.monotonic()
+        path = urllib.parse.urlparse(self.path).path
+        if path.startswith('/api/dashboards/uid/'):
+            if path.endswith('/versions'):
+                body = [{'version': server.dashboard['version']}]
+                server.record('dashboard_versions', time.monotonic() - started)
+            else:
+                body = {'dashboard': server.dashboard, 'meta': {}}
+                server.record('dashboard', time.monotonic() - started)
+            self.send_body(200, json.dumps(body).encode('utf-8'))
+            return
+        if not path.startswith('/render/d-solo/'):
+            self.send_body(404, b'{}')
+            return
+        time.sleep(max(0.0, server.latency + random.uniform(-server.jitter, server.jitter)))
+        roll = random.random()
+        if roll < server.rate_429:
+            self.send_body(429, b'{"message": "Too many requests"}', headers={'Retry-After': '1'})
+        elif roll < server.rate_429 + server.rate_5xx:
+            self.send_body(503, b'{"message": "Renderer unavailable"}')
+        else:
+            self.send_body(200, server.image, content_type='image/png')
+        server.record('render', time.monotonic() - started)
+
+
+class StaticConfig:
+    """Dict-backed stand-in for ConfigManager.get_value."""
+
+    def __init__(self, values: Dict[str, str]):
+        self.values = values
+
+    def get_value(self, key: str, default: str = "") -> str:
+        return self.values.get(key, default)
+
+
+class InfluxStub(StubServer):
+    """Simulates the InfluxDB 1.x /query endpoint: SHOW TAG VALUES returns `containers` instances."""
+
+    def __init__(self, containers: int, latency: float = 0.01):
+        super().__init__(InfluxHandler)
+        self.latency = latency
+        self.containers = [f"bench-container-{i}" for i in range(containers)]
+
+    def mean_series(self, query: str) -> List[dict]:
+        """Synthetic answer to bucketed ("v"), min/max GROUP BY time(…) or raw (5s points) queries:
+        a noisy sine per container over the queried window."""
+        measurement = re.search(r'FROM "([^"]+)"', query).group(1)
+        bounds = [int(ms) for ms in re.findall(r'time [<>] (\d+)ms', query)]
+        end = bounds[1] if len(bounds) > 1 else int(time.time() * 1000)
+        start = bounds[0] if bounds else end - 3_600_000
+        # The outermost GROUP BY time() is the last one
+        buckets = re.findall(r'time\((\d+)s\)', query)
+        interval = int(buckets[-1]) * 1000 if buckets else 5000
+        times = list(range(start - start % interval, end, interval))
+        if query.upper().startswith('SELECT MIN'):
+            columns = ['time', 'min', 'max']
+        else:
+            columns = ['time', 'v' if buckets else 'value']
+        return [
+            {'name': measurement, 'tags': {'instance': c}, 'columns': columns,
+             'values': [[t] + [50 + 40 * math.sin(t / 600_000 + i) + random.random() * 5 for _ in columns[1:]] for t in times]}
+            for i, c in enumerate(self.containers)
+        ]
+
+
+class InfluxHandler(StubHandler):
+    def _query(self):
+        server: InfluxStub = self.server
+        started = time.monotonic()
+        parsed = urllib.parse.urlparse(self.path)
+        params = urllib.parse.parse_qs(parsed.query)
+        if self.command == 'POST':
+            length = int(self.headers.get('Content-Length') or 0)
+            params.update(urllib.parse.parse_qs(self.rfile.read(length).decode('utf-8')))
+        if parsed.path != '/query':
+            self.send_body(404, b'{}')
+            return
+        time.sleep(server.latency)
+        results = [self._statement(server, statement_id, query)
+                   for statement_id, query in enumerate(params.get('q', [''])[0].split(';'))]
+        self.send_body(200, json.dumps({'results': results}).encode('utf-8'))
+        server.record('influx_query', time.monotonic() - started)
+
+    @staticmethod
+    def _statement(server: 'InfluxStub', statement_id: int, query: str) -> dict:
+        query = query.strip()
+        if query.upper().startswith('SHOW TAG VALUES'):
+            series = [{'name': 'kube', 'columns': ['key', 'value'], 'values': [['instance', c] for c in server.containers]}]
+            result = {'statement_id': statement_id, 'series': series}
+        elif query.upper().startswith('SELECT COUNT'):
+            # Every third container is a non-Java sidecar without jvm_* series
+            measurements = re.findall(r'"((?:[^"\\]|\\.)+)"', query.split(' WHERE ')[0])
+            series = [
+                {'name': m, 'tags': {'instance': c}, 'columns': ['time', 'count_value'], 'values': [[0, 120]]}
+                for m in measurements for i, c in enumerate(server.containers)
+                if not (m.startswith('jvm_') and i % 3 == 0)
+            ]
+            result = {'statement_id': statement_id, 'series': series}
+        elif query.upper().startswith(('SELECT MEAN', 'SELECT NON_NEGATIVE_DERIVATIVE', 'SELECT SUM', 'SELECT MIN', 'SELECT "')):
+            result = {'statement_id': statement_id, 'series': server.mean_series(query)}
+        elif query.upper().startswith('SELECT MAX'):
+            # Summary statement: one max / p95 / mean row per instance
+            series = [{'name': re.search(r'FROM "([^"]+)"', query).group(1), 'tags': {'instance': c},
+                       'columns': ['time', 'max', 'percentile', 'mean'], 'values': [[0, 0.9 + i * 0.01, 0.8, 0.5]]}
+                      for i, c in enumerate(server.containers)]
+            result = {'statement_id': statement_id, 'series': series}
+        else:
+            result = {'statement_id': statement_id}
+        return result
+
+    do_GET = _query
+    do_POST = _query
+
+
+class ConfluenceStub(StubServer):
+    """In-memory Confluence REST API covering the calls of ConfluencePageService and ConfluenceAttachmentService."""
+
+    CONFIG_PAGE_ID = '100'
+
+    def __init__(self, namespaces=('bench',), latency: float = 0.01, upload_latency: float = 0.02):
+        super().__init__(ConfluenceHandler)
+        self.latency = latency
+        self.upload_latency = upload_latency
+        self.pages: Dict[str, dict] = {}
+        self.attachments: Dict[str, Dict[str, dict]] = {}  # page id -> file name -> attachment
+        self._ids = itertools.count(1000)
+        self._data_lock = threading.Lock()
+        rows = ''.join(
+            f"<tr><td><p>{ns.upper()}</p></td><td>{ns}-pod</td><td>1.0</td><td>01.01.2025</td><td>OK</td><td>2cpu/4Gi</td><td>-Xmx2g</td></tr>"
+            for ns in namespaces
+        )
+        self.add_page(self.CONFIG_PAGE_ID, 'Config', f"<table><tbody><tr><th>FP</th></tr>{rows}</tbody></table>")
+
+    def add_page(self, page_id: str, title: str, body: str) -> dict:
+        page = {'id': page_id, 'type': 'page', 'title': title, 'version': {'number': 1},
+                'body': {'storage': {'value': body, 'representation': 'storage'}}}
+        with self._data_lock:
+            self.pages[page_id] = page
+            self.attachments.setdefault(page_id, {})
+        return page
+
+    def next_id(self) -> str:
+        with self._data_lock:
+            return str(next(self._ids))
+
+
+class ConfluenceHandler(StubHandler):
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+    def _json(self, status: int, data):
+        self.send_body(status, json.dumps(data).encode('utf-8'))
+
+    def _route(self):
+        parsed = urllib.parse.urlparse(self.path)
+        parts = [p for p in parsed.path.split('/') if p]
+        # rest/api/content[/{id}[/child/attachment[/{attachment id}/data] | /history]]
+        if parts[:3] != ['rest', 'api', 'content']:
+            return 'unknown', parts[3:], parsed
+        rest = parts[3:]
+        if not rest:
+            return 'content', rest, parsed
+        if len(rest) == 1:
+            return 'page', rest, parsed
+        if rest[1:3] == ['child', 'attachment']:
+            return 'attachment', rest, parsed
+        if rest[1] == 'history':
+            return 'history', rest, parsed
+        return 'unknown', rest, parsed
+
+    def _handle(self):
+        server: ConfluenceStub = self.server
+        started = time.monotonic()
+        kind, rest, parsed = self._route()
+        params = urllib.parse.parse_qs(parsed.query)
+        body = self._read_body()
+        route = f"confluence_{kind}_{self.command.lower()}"
+        time.sleep(server.upload_latency if kind == 'attachment' and self.command == 'POST' else server.latency)
+
+        if kind == 'content' and self.command == 'POST':
+            data = json.loads(body or b'{}')
+            page = server.add_page(server.next_id(), data.get('title', ''), data.get('body', {}).get('storage', {}).get('value', ''))
+            self._json(200, page)
+        elif kind == 'page' and rest[0] in server.pages:
+            page = server.pages[rest[0]]
+            if self.command == 'GET':
+                self._json(200, page)
+            elif self.command == 'PUT':
+                data = json.loads(body or b'{}')
+                with server._data_lock:
+                    page['title'] = data.get('title', page['title'])
+                    page['version'] = {'number': data.get('version', {}).get('number', page['version']['number'] + 1)}
+                    if 'body' in data:
+                        page['body'] = {'storage': {'value': data['body']['storage']['value'], 'representation': 'storage'}}
+                self._json(200, page)
+            else:
+                self._json(405, {})
+        elif kind == 'history' and rest[0] in server.pages:
+            self._json(200, {'lastUpdated': {'number': server.pages[rest[0]]['version']['number']}})
+        elif kind == 'attachment' and rest[0] in server.attachments:
+            self._attachment(server, rest, params, body)
+        else:
+            self._json(404, {'message': 'not found'})
+        server.record(route, time.monotonic() - started)
+
+    def _attachment(self, server: 'ConfluenceStub', rest, params, body: bytes):
+        files = server.attachments[rest[0]]
+        if self.command == 'GET':
+            with server._data_lock:
+                results = list(files.values())
+            if 'filename' in params:
+                results = [a for a in results if a['title'] == params['filename'][0]]
+            start = int(params.get('start', ['0'])[0])
+            limit = int(params.get('limit', ['50'])[0])
+            page = results[start:start + limit]
+            self._json(200, {'results': page, 'start': start, 'limit': limit, 'size': len(page)})
+            return
+        fields = parse_multipart(self.headers.get('Content-Type', ''), body)
+        name = fields.get('fileName') or fields.get('file', ('', b''))[0]
+        new_id = f"att{server.next_id()}"
+        with server._data_lock:
+            attachment = files.get(name) or {'id': new_id, 'type': 'attachment', 'title': name}
+            attachment['metadata'] = {'comment': fields.get('comment', ''), 'mediaType': fields.get('contentType', '')}
+            attachment['extensions'] = {'fileSize': len(fields.get('file', ('', b''))[1])}
+            files[name] = attachment
+        self._json(200, {'results': [attachment], 'size': 1})
+
+    do_GET = _handle
+    do_POST = _handle
+    do_PUT = _handle
+    do_DELETE = _handle
+
+
+def parse_multipart(content_type: str, body: bytes) -> dict:
+    """Minimal multipart/form-data parser: text fields as str, file fields as (filename, bytes)."""
+    message = BytesParser().parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode('utf-8') + body)
+    fields = {}
+    if not message.is_multipart():
+        return fields
+    for part in message.get_payload():
+        name = part.get_param('name', header='content-disposition')
+        filename = part.get_filename()
+        payload = part.get_payload(decode=True) or b''
+        fields[name] = (filename, payload) if filename else payload.decode('utf-8', 'replace')
+    return fields
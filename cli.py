@@ -0,0 +1,140 @@
+# cli.py
+"""
+Headless entry point: the Influx → Grafana → Confluence report flow without Qt.
+
+Settings come from a JSON file (--config) and LTTOOLS_<key> environment variables,
+with the same keys as the GUI settings. Progress and results are printed to stdout
+as JSON lines; logs go to stderr.
+
+    python cli.py containers --fp VAT --from "01.02.2025 10:00" --to "01.02.2025 12:00"
+    python cli.py report --fp VAT --test stability --from ... --to ... --page-name "..." --space SPACE --parent-id 123
+    python cli.py report --fp VAT --test stability --from ... --to ... --page-name "..." --page-id 456   # append mode
+    python cli.py report ... --summary-only   # summary table without screenshots
+    python cli.py batch jobs.json
+"""
+import argparse
+import json
+import sys
+import time
+
+from utils.report_templates import TEST_TEMPLATES
+
+# Имя теста в GUI по ключу шаблона
+TEST_NAMES = {template: test_name for test_name, template in TEST_TEMPLATES.items()}
+
+STARTED = time.perf_counter()
+
+
+def emit(event: str, **fields):
+    """Prints one machine-readable JSON line."""
+    record = {'event': event, 't': round(time.perf_counter() - STARTED, 3), **fields}
+    print(json.dumps(record, ensure_ascii=False, default=str), flush=True)
+
+
+def load_config(args):
+    from headless_config import HeadlessConfig
+    return HeadlessConfig(args.config)
+
+
+def job_params(job: dict) -> dict:
+    """Normalizes a CLI/batch job into the params dict the GUI passes to the pipeline."""
+    params = dict(job)
+    params['test_name'] = TEST_NAMES.get(params.get('test_name'), params.get('test_name'))
+    params.setdefault('append_mode', bool(params.get('page_id')))
+    return params
+
+
+def report_summary(result: dict) -> dict:
+    graphics = result.pop('graphics', None) or {}
+    result['containers'] = len(graphics)
+    result['screenshots'] = sum(len(panels) for panels in graphics.values())
+    return result
+
+
+def cmd_containers(args) -> int:
+    from service.influx_query_service import InfluxQueryService
+
+    config = load_config(args)
+    started = time.perf_counter()
+    containers = InfluxQueryService(config).get_containers(args.fp.lower(), args.from_dt, args.to_dt)
+    emit('result', fp_code=args.fp, containers=containers, elapsed=round(time.perf_counter() - started, 3))
+    return 0
+
+
+def cmd_report(args) -> int:
+    from workers.report_pipeline import ReportPipeline
+
+    params = job_params({
+        'fp_code': args.fp,
+        'test_name': args.test,
+        'from_dt': args.from_dt,
+        'to_dt': args.to_dt,
+        'page_name': args.page_name,
+        'page_id': args.page_id,
+        'space': args.space,
+        'parent_id': args.parent_id,
+    })
+    if args.summary_only:
+        params['summary_only'] = True
+    pipeline = ReportPipeline(load_config(args))
+    try:
+        result = pipeline.run(params, lambda value: emit('progress', fp_code=args.fp, value=value))
+    finally:
+        pipeline.close()
+    emit('result', fp_code=args.fp, **report_summary(result))
+    return 0 if result['success'] else 1
+
+
+def cmd_batch(args) -> int:
+    from workers.batch_runner import BatchReportRunner
+
+    with open(args.jobs, 'r', encoding='utf-8') as file:
+        jobs = [job_params(job) for job in json.load(file)]
+    runner = BatchReportRunner(load_config(args), args.parallel)
+    try:
+        results = runner.run(jobs, lambda fp_code, value: emit('progress', fp_code=fp_code, value=value))
+    finally:
+        runner.close()
+    for result in results:
+        emit('result', **result)
+    return 0 if all(result['success'] for result in results) else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--config', help='JSON file with settings (keys as in the GUI settings)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_window(subparser):
+        subparser.add_argument('--fp', required=True, help='FP code, e.g. VAT')
+        subparser.add_argument('--from', dest='from_dt', required=True, help='"dd.MM.yyyy HH:mm", epoch ms or now-…')
+        subparser.add_argument('--to', dest='to_dt', required=True)
+
+    containers = subparsers.add_parser('containers', help='list containers with data in the window')
+    add_window(containers)
+    containers.set_defaults(func=cmd_containers)
+
+    report = subparsers.add_parser('report', help='build and publish one report')
+    add_window(report)
+    report.add_argument('--test', required=True, choices=sorted(TEST_NAMES))
+    report.add_argument('--page-name', required=True)
+    report.add_argument('--page-id', help='existing page to append to (append mode)')
+    report.add_argument('--space', help='space of the new page')
+    report.add_argument('--parent-id', help='parent of the new page')
+    report.add_argument('--summary-only', action='store_true', help='numeric summary table only, no screenshots (Report_summary_only)')
+    report.set_defaults(func=cmd_report)
+
+    batch = subparsers.add_parser('batch', help='run a JSON list of report jobs with shared clients')
+    batch.add_argument('jobs', help='JSON file: [{"fp_code", "test_name", "from_dt", "to_dt", "page_name", "page_id" | "space"+"parent_id"}, ...]')
+    batch.add_argument('--parallel', type=int, help='jobs running at once (Batch_max_parallel_jobs)')
+    batch.set_defaults(func=cmd_batch)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
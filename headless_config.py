@@ -0,0 +1,121 @@
+# headless_config.py
+import json
+import os
+from typing import Dict, Optional
+
+# Значения по умолчанию — общие для GUI (QSettings) и headless-запусков
+DEFAULT_SETTINGS = {
+    "Grafana_host": "http://localhost",
+    "Grafana_port": "3000",
+    "Grafana_api_token": "",
+    "Grafana_dashboard_uid": "default-dashboard",
+    "Grafana_param5": "",
+    "Confluence_url": "https://your-company.atlassian.net",
+    "Confluence_api_token": "",
+    "Confluence_username": "",
+    "Confluence_param9": "",
+    "reflex_transfer_url": "https://reflex_transfer_api.god",
+
+    "Grafana_max_workers": "10",
+    "Grafana_request_delay": "0.5",
+    "Grafana_max_retries": "3",
+    "Grafana_dashboard_slug": "Dashboard-evg",
+    "Influxdb_url": "",
+    "Influxdb_port": "8086",
+    "Influxdb_username": "",
+    "Influxdb_password": "",
+    "Influxdb_database": "system_metrics",
+    "Confluence_page_id_conf": "",
+
+    # Рендер Grafana: threads / async / native
+    "Grafana_render_backend": "threads",
+    "Grafana_async_concurrency": "100",
+    "Grafana_org_id": "1",
+    "Grafana_refresh": "5s",
+    "Grafana_time_interval": "default",
+    "Grafana_panel_width": "1200",
+    "Grafana_panel_height": "600",
+    "Grafana_connect_timeout": "10",
+    "Grafana_read_timeout": "60",
+    "Grafana_rate_limit": "0",
+    "Grafana_target_latency": "15",
+    "Grafana_backoff_base": "1",
+    "Grafana_backoff_max": "60",
+    "Grafana_circuit_failures": "10",
+    "Grafana_circuit_reset": "30",
+    "Grafana_cache_dir": "./.render_cache",
+    "Grafana_cache_max_mb": "1024",
+    "Grafana_memory_budget_mb": "0",
+    "Grafana_archive_to_disk": "true",
+    "Grafana_panel_catalog_ttl": "600",
+    "Grafana_panel_rules": "",
+
+    # Native-рендер из InfluxDB
+    "Native_render_processes": "0",
+    "Native_downsample": "mean",
+    "Native_chunk_size": "10000",
+    "Native_fallback": "grafana",
+
+    # InfluxDB
+    "Influxdb_cache_ttl": "300",
+    "Influxdb_discovery_timeout": "60",
+    "Influxdb_discovery_retry_interval": "3",
+    "Influxdb_data_precheck": "true",
+    "Influxdb_panel_measurements": "",
+    "Influxdb_summary_metrics": "",
+    "Influxdb_summary_interval": "30",
+
+    # Confluence
+    "Confluence_upload_workers": "4",
+    "Confluence_upload_retries": "3",
+    "Confluence_upload_queue_size": "50",
+    "Confluence_cache_dir": "./.render_cache",
+
+    # Отчёт
+    "Report_summary": "true",
+    "Report_summary_only": "false",
+    "Report_templates_dir": "./resources/test_templates",
+    "Trace_dir": "./traces",
+    "Batch_max_parallel_jobs": "4",
+
+    # Reflex Transfer
+    "Reflex_pool_size": "10",
+    "Reflex_timeout": "30",
+    "Reflex_max_retries": "2",
+    "Reflex_backoff_factor": "0.5",
+    "Reflex_retry_methods": "GET",
+    "Reflex_cert_file": "./resources/certs/tls.crt",
+    "Reflex_key_file": "./resources/certs/tls.key",
+    "Reflex_bulk_max_parallel": "8",
+    "Reflex_backfill_chunk_hours": "24",
+}
+
+ENV_PREFIX = "LTTOOLS_"
+
+
+class HeadlessConfig:
+    """
+    Конфигурация без Qt: та же get_value(), что у ConfigManager.
+    Приоритет: переменные окружения LTTOOLS_<ключ> > JSON-файл > значения по умолчанию.
+    """
+
+    def __init__(self, path: Optional[str] = None, environ: Optional[Dict[str, str]] = None):
+        self.defaults = dict(DEFAULT_SETTINGS)
+        self.values = dict(self.defaults)
+        if path:
+            with open(path, "r", encoding="utf-8") as file:
+                # Строки — как есть; вложенные объекты, списки, числа и bool — в JSON ("true", не "True")
+                self.values.update({key: value if isinstance(value, str) else json.dumps(value)
+                                    for key, value in json.load(file).items()})
+        environ = os.environ if environ is None else environ
+        for name, value in environ.items():
+            if name.startswith(ENV_PREFIX):
+                self.values[name[len(ENV_PREFIX):]] = value
+
+    def set_value(self, key: str, value: str):
+        """Устанавливает значение на время запуска (ничего не сохраняет)"""
+        self.values[key] = value
+
+    def get_value(self, key: str, default: str = "") -> str:
+        """Получает значение (с fallback на дефолт)"""
+        return self.values.get(key, default)
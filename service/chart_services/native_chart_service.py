@@ -0,0 +1,187 @@
+# service/chart_services/native_chart_service.py
+
+import json
+import math
+import multiprocessing
+import os
+import threading
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from io import BytesIO
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from service.grafana_services.grafana_sceernshot_service import GrafanaScreenshotService
+from service.influx_query_service import InfluxQueryService
+from utils.panel_metrics import panel_specs
+from utils.parse_utils import to_epoch_ms
+from utils.tracing import NULL_TRACER, Tracer
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def render_chart_png(title: str, series: Dict[str, Tuple[np.ndarray, np.ndarray]], width: int, height: int) -> Tuple[bytes, float]:
+    """Draws one panel as PNG in a worker process; returns (png bytes, seconds spent)."""
+    started = time.perf_counter()
+    # Figure + Agg canvas directly, without pyplot's global state
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.dates import AutoDateLocator, ConciseDateFormatter
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(width / 100, height / 100), dpi=100)
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    for label, (times, values) in sorted(series.items()):
+        axes.plot(times.astype('datetime64[ms]'), values, linewidth=1, label=label)
+    if series:
+        locator = AutoDateLocator()
+        axes.xaxis.set_major_locator(locator)
+        axes.xaxis.set_major_formatter(ConciseDateFormatter(locator))
+        if len(series) > 1:
+            axes.legend(loc='upper left', fontsize='small', frameon=False)
+    else:
+        axes.text(0.5, 0.5, 'No data', ha='center', va='center', transform=axes.transAxes)
+    axes.set_title(title, loc='left', fontsize='medium')
+    axes.grid(alpha=0.3)
+    # Fixed margins: tight_layout() measures every label and costs a third of the render
+    figure.subplots_adjust(left=0.07, right=0.98, top=0.93, bottom=0.08)
+    buffer = BytesIO()
+    figure.savefig(buffer, format='png')
+    return buffer.getvalue(), time.perf_counter() - started
+
+
+class NativeChartService(GrafanaScreenshotService):
+    """Renders panels locally from InfluxDB data instead of Grafana's headless browser.
+
+    One bulk query per panel metric fetches the series of all containers, already reduced to
+    about one point per pixel column (Native_downsample); charts are drawn in a process pool. Files are named and stored
+    exactly like Grafana renders, so the Confluence content does not change. Panels the native renderer cannot
+    reproduce (no spec, or "native": false) are rendered in Grafana (Native_fallback).
+    """
+
+    def __init__(self, config_manager, influx_service: Optional[InfluxQueryService] = None):
+        super().__init__(config_manager)
+        self.influx_service = influx_service or InfluxQueryService(config_manager)
+        self.width = int(config_manager.get_value('Grafana_panel_width', '1200'))
+        self.height = int(config_manager.get_value('Grafana_panel_height', '600'))
+        self.render_processes = int(config_manager.get_value('Native_render_processes', '0') or 0) or os.cpu_count() or 2
+        # mean / minmax: downsampled by InfluxDB (GROUP BY time); lttb: raw points read in chunks, reduced here
+        self.downsample = config_manager.get_value('Native_downsample', 'mean')
+        self.chunk_size = int(config_manager.get_value('Native_chunk_size', '10000'))
+        # Panels without a faithful native spec (see utils.panel_metrics): grafana renders them as before, skip leaves them out
+        self.fallback = config_manager.get_value('Native_fallback', 'grafana')
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        """Long-lived render processes, shared by concurrent runs (started on first use)."""
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn, not fork: the pool starts from a worker thread while Qt, render and upload threads
+                # hold locks (logging, queues) that a forked child would inherit in a locked state
+                self._pool = ProcessPoolExecutor(max_workers=self.render_processes, mp_context=multiprocessing.get_context('spawn'))
+            return self._pool
+
+    def make_screenshots(self, containers: List[str], start_time: str, end_time: str, namespace: str,
+                         on_result: Optional[Callable[[str, str, Optional[str], int, int], None]] = None,
+                         tracer: Tracer = NULL_TRACER,
+                         has_data: Optional[Callable[[str, str], bool]] = None) -> Dict[str, Dict[str, str]]:
+        """Same contract as GrafanaScreenshotService.make_screenshots, rendered from InfluxDB data."""
+        self.screenshot_store.ensure_dir(namespace)
+        specs = {graphic_name: spec for graphic_name, spec in panel_specs(self.config).items() if spec['native']}
+        now_ms = int(time.time() * 1000)
+        start_ms, end_ms = to_epoch_ms(start_time, now_ms), to_epoch_ms(end_time, now_ms)
+        interval_s = max(1, math.ceil(max(1.0, (end_ms - start_ms) / 1000) / self.width))
+
+        # Tasks grouped by query, so panels sharing a measurement subset share one query
+        tasks_by_query: Dict[str, List[Dict]] = {}
+        query_specs: Dict[str, Dict] = {}
+        for container in containers:
+            for graphic_name in self.panel_catalog.panels_for(container, dict.fromkeys(specs, 0)):
+                if has_data and not has_data(container, graphic_name):
+                    continue
+                key = json.dumps(specs[graphic_name], sort_keys=True)
+                query_specs[key] = specs[graphic_name]
+                tasks_by_query.setdefault(key, []).append({'container': container, 'graphic_name': graphic_name, 'namespace': namespace})
+        fallback_tasks = [task for task in self._create_screenshot_tasks(containers, start_time, end_time, namespace, has_data)
+                          if task['graphic_name'] not in specs]
+        if fallback_tasks:
+            panels = sorted({task['graphic_name'] for task in fallback_tasks})
+            if self.fallback == 'grafana':
+                logger.warning(f"{len(panels)} panels cannot be drawn natively, rendering them in Grafana: {', '.join(panels)}")
+            else:
+                logger.warning(f"{len(panels)} panels cannot be drawn natively, skipping them (Native_fallback={self.fallback}): {', '.join(panels)}")
+                fallback_tasks = []
+        total = sum(len(tasks) for tasks in tasks_by_query.values()) + len(fallback_tasks)
+        results = {container: {} for container in containers}
+        errors = []
+        done = 0
+
+        def collect(task: Dict, filepath, error):
+            nonlocal done
+            done += 1
+            if error:
+                errors.append(f"{task['container']}/{task['graphic_name']}: {error}")
+            elif filepath:
+                results[task['container']][task['graphic_name']] = filepath
+            if on_result:
+                on_result(task['container'], task['graphic_name'], filepath, done, total)
+
+        def query(key: str):
+            with tracer.span(f"SELECT {self.downsample}", 'http', f"{self.config.get_value('Influxdb_url')}:{self.config.get_value('Influxdb_port')}",
+                             measurement=query_specs[key]['measurement']):
+                if self.downsample == 'lttb':
+                    return self.influx_service.get_panel_series_raw(namespace, query_specs[key], start_time, end_time,
+                                                                    start_ms, end_ms, self.width, self.chunk_size)
+                return self.influx_service.get_panel_series(namespace, query_specs[key], start_time, end_time, interval_s, self.downsample)
+
+        # Charts of a metric start rendering as soon as its query returns
+        renders = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(query_specs))), thread_name_prefix='native-query') as query_pool:
+            queries = {query_pool.submit(query, key): key for key in query_specs}
+            for future in as_completed(queries):
+                tasks = tasks_by_query[queries[future]]
+                try:
+                    series = future.result()
+                except Exception as error:
+                    logger.error(f"Query for {query_specs[queries[future]]['measurement']} failed: {error}")
+                    for task in tasks:
+                        collect(task, None, error)
+                    continue
+                for task in tasks:
+                    render = self.pool.submit(render_chart_png, task['graphic_name'], series.get(task['container'], {}), self.width, self.height)
+                    renders[render] = task
+
+        def collect_grafana(result: tuple):
+            container, graphic_name, filepath, error = result
+            collect({'container': container, 'graphic_name': graphic_name}, filepath, error)
+
+        # Grafana fallbacks go while the render processes draw the native charts
+        if fallback_tasks:
+            self.scheduler.run(fallback_tasks, lambda task: self.process_single_screenshot(task, tracer), collect_grafana)
+
+        for future in as_completed(renders):
+            task = renders[future]
+            try:
+                content, elapsed = future.result()
+                tracer.add('render', 'native', time.perf_counter() - elapsed, elapsed, container=task['container'], graphic=task['graphic_name'])
+                collect(task, self.store_screenshot(task, content), None)
+            except Exception as error:
+                logger.error(f"Failed {task['container']}/{task['graphic_name']}: {error}")
+                collect(task, None, error)
+        if errors:
+            logger.warning(f"{len(errors)} errors occurred")
+        logger.info(f"Rendered {total - len(errors)} charts ({len(fallback_tasks)} in Grafana) from {len(query_specs)} queries at {interval_s}s resolution")
+        return {k: v for k, v in results.items() if v}
+
+    def close(self):
+        """Stops the render processes and closes pooled connections."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+        super().close()
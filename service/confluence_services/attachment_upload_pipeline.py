@@ -0,0 +1,84 @@
+import os
+import queue
+import threading
+import logging
+from typing import Callable, Dict, Optional
+from service.confluence_services.confluence_attachment_service import FAILED
+from utils.tracing import NULL_TRACER, Tracer
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+_STOP = object()
+
+
+class AttachmentUploadPipeline:
+    """Uploads screenshots as soon as they are rendered: bounded queue drained by its own worker pool."""
+
+    def __init__(self, attachment_service, page_id: str, workers: int = 4, queue_size: int = 50,
+                 on_uploaded: Optional[Callable[[str, str], None]] = None, tracer: Tracer = NULL_TRACER):
+        self.attachment_service = attachment_service
+        self.page_id = page_id
+        self.on_uploaded = on_uploaded
+        self.tracer = tracer
+        self.results: Dict[str, str] = {}
+        # Fetched once so unchanged files can be skipped without a request each
+        with tracer.span('list_attachments', 'confluence'):
+            self.existing = attachment_service.get_existing_attachments(page_id)
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"confluence-upload-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, filepath: str):
+        """Queues a file for upload, blocking while the queue is full."""
+        self._queue.put(filepath)
+
+    def _worker(self):
+        while True:
+            filepath = self._queue.get()
+            try:
+                if filepath is _STOP:
+                    return
+                self._upload(filepath)
+            finally:
+                self._queue.task_done()
+
+    def _upload(self, filepath):
+        """Uploads one queued file; never raises, so one failure cannot stop the worker and stall the queue."""
+        name = os.path.basename(os.fspath(filepath))
+        status = FAILED
+        try:
+            with self.tracer.span('upload', 'confluence', file=name):
+                status = self.attachment_service.upload_file(filepath, self.page_id, self.existing, self.tracer)
+        except Exception as error:
+            logger.error(f"Upload of {name} failed: {error}")
+        finally:
+            # In-memory images are not needed after upload; frees room in the memory budget
+            if hasattr(filepath, 'release'):
+                try:
+                    filepath.release()
+                except Exception as error:
+                    logger.error(f"Releasing {name} failed: {error}")
+            with self._lock:
+                self.results[filepath] = status
+        if self.on_uploaded:
+            try:
+                self.on_uploaded(filepath, status)
+            except Exception as error:
+                logger.error(f"on_uploaded failed for {name}: {error}")
+
+    def close(self) -> Dict[str, str]:
+        """Waits for queued uploads to finish and returns {filepath: 'uploaded' | 'skipped' | 'failed'}."""
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        failed = [path for path, status in self.results.items() if status == FAILED]
+        if failed:
+            logger.warning(f"{len(failed)} attachments failed to upload")
+        return self.results
@@ -1,38 +1,138 @@
+import hashlib
+import mimetypes
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from atlassian import Confluence
-from typing import List, Dict
+from typing import List, Dict, Optional, Union, TYPE_CHECKING
 from pathlib import Path
-from config import ConfigManager
+from service.grafana_services.screenshot_store import RenderedImage
+from utils.tracing import NULL_TRACER, Tracer, host_of
 import logging
 
+if TYPE_CHECKING:
+    from config import ConfigManager
+
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# Per-file upload results
+UPLOADED = 'uploaded'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+
+HASH_PREFIX = 'sha256:'
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file's content, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 class ConfluenceAttachmentService:
     """Service for managing Confluence attachments (upload, list, delete)."""
 
-    def __init__(self, config: ConfigManager):
+    def __init__(self, config: 'ConfigManager'):
         self.confluence = Confluence(
             url=config.get_value('Confluence_url'),
             token=config.get_value('Confluence_api_token'),
             verify_ssl=False
         )
+        self.upload_workers = int(config.get_value('Confluence_upload_workers', '4'))
+        self.upload_retries = int(config.get_value('Confluence_upload_retries', '3'))
+
+    def get_existing_attachments(self, page_id: str) -> Dict[str, Dict[str, str]]:
+        """Maps attachment file names of a page to {'id', 'hash'}, the hash being the one stored in their comment."""
+        existing = {}
+        for attachment in self.get_page_attachments(page_id):
+            comment = (attachment.get('metadata') or {}).get('comment') or (attachment.get('extensions') or {}).get('comment') or ''
+            existing[attachment.get('title', '')] = {
+                'id': attachment.get('id', ''),
+                'hash': comment[len(HASH_PREFIX):] if comment.startswith(HASH_PREFIX) else '',
+            }
+        return existing
+
+    def upload_file(self, screenshot: Union[str, RenderedImage], page_id: str, existing: Optional[Dict[str, Dict[str, str]]] = None,
+                    tracer: Tracer = NULL_TRACER) -> str:
+        """Uploads a single file or in-memory image unless the page already has it with the same content; retries on errors.
 
-    def upload_attachments(self, graphics: Dict[str, Dict[str, str]], page_id: str) -> bool:
-        """Uploads all graphics as attachments to a page."""
+        existing (get_existing_attachments) spares a lookup per file: known files get a new version
+        of the same attachment, others are created, one POST each. Created files are added to it.
+        """
+        filename = os.path.basename(os.fspath(screenshot))
+        data = getattr(screenshot, 'data', None)
+        path = getattr(screenshot, 'path', None) or os.fspath(screenshot)
         try:
-            for container_graphics in graphics.values():
-                for screenshot_path in container_graphics.values():
-                    self.confluence.attach_file(screenshot_path, page_id=page_id)
-            return True
-        except Exception as error:
-            logger.error(f"Error uploading attachments: {error}")
-            return False
+            content_hash = hashlib.sha256(data).hexdigest() if data is not None else file_sha256(path)
+        except OSError as error:
+            logger.error(f"Error reading attachment {path}: {error}")
+            return FAILED
+        if existing is None:
+            existing = self.get_existing_attachments(page_id)
+        known = existing.get(filename)
+        if known and known['hash'] == content_hash:
+            return SKIPPED
+        comment = f"{HASH_PREFIX}{content_hash}"
+        for attempt in range(self.upload_retries):
+            try:
+                with tracer.span('POST attachment', 'http', host_of(self.confluence.url), attempt=attempt + 1):
+                    if data is not None:
+                        response = self._post_attachment(page_id, filename, data, comment, known and known['id'])
+                    else:
+                        with open(path, 'rb') as file:
+                            response = self._post_attachment(page_id, filename, file, comment, known and known['id'])
+                results = (response or {}).get('results') or [response or {}]
+                existing[filename] = {'id': results[0].get('id') or (known or {}).get('id', ''), 'hash': content_hash}
+                return UPLOADED
+            except Exception as error:
+                logger.warning(f"Error uploading attachment {filename} (attempt {attempt + 1}): {error}")
+                if attempt < self.upload_retries - 1:
+                    with tracer.span('retry_wait', 'wait', error=type(error).__name__):
+                        time.sleep((attempt + 1) * 2)
+        return FAILED
+
+    def _post_attachment(self, page_id: str, filename: str, content, comment: str, attachment_id: Optional[str] = None) -> Dict:
+        """POSTs a new attachment, or a new version of attachment_id (internal)."""
+        path = f"rest/api/content/{page_id}/child/attachment"
+        if attachment_id:
+            path += f"/{attachment_id}/data"
+        content_type = mimetypes.guess_type(filename)[0] or 'application/binary'
+        return self.confluence.post(
+            path=path,
+            data={'type': 'attachment', 'fileName': filename, 'contentType': content_type, 'comment': comment, 'minorEdit': 'true'},
+            headers={'X-Atlassian-Token': 'no-check', 'Accept': 'application/json'},
+            files={'file': (filename, content, content_type)},
+        )
+
+    def upload_attachments(self, graphics: Dict[str, Dict[str, Union[str, RenderedImage]]], page_id: str) -> Dict[str, str]:
+        """Uploads all graphics as attachments to a page in parallel, skipping unchanged files.
+
+        Returns {screenshot_path: 'uploaded' | 'skipped' | 'failed'}.
+        """
+        paths = [path for container_graphics in graphics.values() for path in container_graphics.values()]
+        existing = self.get_existing_attachments(page_id)
+        with ThreadPoolExecutor(max_workers=max(1, self.upload_workers), thread_name_prefix='confluence-upload') as executor:
+            statuses = executor.map(lambda path: self.upload_file(path, page_id, existing), paths)
+            results = dict(zip(paths, statuses))
+        failed = [path for path, status in results.items() if status == FAILED]
+        if failed:
+            logger.error(f"Error uploading {len(failed)} of {len(results)} attachments")
+        return results
 
     def get_page_attachments(self, page_id: str) -> List[Dict]:
         """Gets list of attachments for a page."""
         try:
-            attachments = self.confluence.get_attachments_from_content(page_id)
-            return attachments.get('results', [])
+            attachments = []
+            while True:
+                page = self.confluence.get_attachments_from_content(page_id, start=len(attachments), limit=200)
+                results = page.get('results', [])
+                attachments.extend(results)
+                # The server may cap the page size below the requested limit
+                if not results or len(results) < page.get('limit', 200):
+                    return attachments
         except Exception as error:
             logger.error(f"Error getting attachments: {error}")
             return []
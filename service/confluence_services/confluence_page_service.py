@@ -1,8 +1,11 @@
 import os
 from atlassian import Confluence
-from typing import List, Dict
-from config import ConfigManager
+from typing import List, Dict, TYPE_CHECKING
 import logging
+from utils.confluence_content_builder import content_hash, replace_report_section
+
+if TYPE_CHECKING:
+    from config import ConfigManager
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -10,7 +13,7 @@ logging.basicConfig(level=logging.INFO)
 class ConfluencePageService:
     """Service for managing Confluence pages (create, update, delete, check existence)."""
 
-    def __init__(self, config: ConfigManager):
+    def __init__(self, config: 'ConfigManager'):
         self.confluence = Confluence(
             url=config.get_value('Confluence_url'),
             token=config.get_value('Confluence_api_token'),
@@ -32,19 +35,28 @@ class ConfluencePageService:
             logger.error(f"Error creating page: {error}")
             return ''
 
+    def get_page(self, page_id: str) -> Dict:
+        """Fetches a page with its version and storage body in one request."""
+        return self.confluence.get_page_by_id(page_id, expand='body.storage,version')
+
+    def put_page(self, page_id: str, title: str, body: str, version: int):
+        """Stores a new page version directly (update_page() re-reads the page to find its version)."""
+        self.confluence.put(f"rest/api/content/{page_id}", data={
+            'id': page_id,
+            'type': 'page',
+            'title': title,
+            'body': {'storage': {'value': body, 'representation': 'storage'}},
+            'version': {'number': version + 1, 'minorEdit': False},
+        })
+
     def update_page_content(self, page_id: str, title: str, new_content: str) -> bool:
-        """Updates the content of an existing page."""
+        """Updates the content of an existing page; skipped if the page already has this content."""
         try:
-            current_version = self.confluence.get_page_by_id(page_id, expand='version')['version']['number']
-            self.confluence.update_page(
-                page_id=page_id,
-                title=title,
-                body=new_content,
-                type='page',
-                representation='storage',
-                minor_edit=False,
-                version=current_version + 1
-            )
+            page = self.get_page(page_id)
+            if content_hash(page['body']['storage']['value']) == content_hash(new_content):
+                logger.info(f"Page {page_id} is up to date")
+                return True
+            self.put_page(page_id, title or page['title'], new_content, page['version']['number'])
             return True
         except Exception as error:
             logger.error(f"Error updating page {page_id}: {error}")
@@ -53,24 +65,30 @@ class ConfluencePageService:
     def append_to_page(self, page_id: str, title: str, append_content: str) -> bool:
         """Appends content to an existing page."""
         try:
-            current_page = self.confluence.get_page_by_id(page_id, expand='body.storage')
-            current_content = current_page['body']['storage']['value']
-            current_version = current_page['version']['number']
-            new_content = current_content + append_content
-            self.confluence.update_page(
-                page_id=page_id,
-                title=title,
-                body=new_content,
-                type='page',
-                representation='storage',
-                minor_edit=False,
-                version=current_version + 1
-            )
+            page = self.get_page(page_id)
+            self.put_page(page_id, title or page['title'], page['body']['storage']['value'] + append_content, page['version']['number'])
             return True
         except Exception as error:
             logger.error(f"Error appending to page {page_id}: {error}")
             return False
 
+    def update_section(self, page_id: str, title: str, key: str, content: str) -> bool:
+        """Replaces report section `key` of a page (or appends it), leaving the rest of the page as is.
+
+        One GET for body and version; no PUT when the section already holds this content.
+        """
+        try:
+            page = self.get_page(page_id)
+            body = replace_report_section(page['body']['storage']['value'], key, content)
+            if body is None:
+                logger.info(f"Section {key} of page {page_id} is up to date")
+                return True
+            self.put_page(page_id, title or page['title'], body, page['version']['number'])
+            return True
+        except Exception as error:
+            logger.error(f"Error updating section {key} of page {page_id}: {error}")
+            return False
+
     def page_exists(self, page_id: str) -> bool:
         """Checks if a page exists by ID."""
         try:
@@ -0,0 +1,117 @@
+# service/grafana_services/backoff_controller.py
+
+import random
+import threading
+import time
+import logging
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a render while the renderer is considered down."""
+
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delay-seconds or HTTP-date), None if absent or invalid."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - (now or datetime.now(timezone.utc))).total_seconds())
+
+
+class BackoffController:
+    """Retry timing shared by all render workers of a service.
+
+    - retry delays grow exponentially with full jitter, or follow Retry-After when the server sends it;
+    - an overload signal (429/503) pauses every worker until the same deadline, and each one resumes
+      after its own small jitter so they do not hit the renderer again all at once;
+    - after `failure_threshold` consecutive failures (5xx, connection errors) the circuit opens and
+      renders fail fast with CircuitOpenError; after `reset_timeout` one probe request is let
+      through and its result closes or reopens the circuit.
+    """
+
+    def __init__(self, base_delay: float = 1.0, max_delay: float = 60.0, failure_threshold: int = 10,
+                 reset_timeout: float = 30.0, rng: Callable[[], float] = random.random,
+                 clock: Callable[[], float] = time.monotonic):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self._rng = rng
+        self._clock = clock
+        self._pause_until = 0.0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def retry_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Wait before retry number attempt + 1: Retry-After if given, else full-jitter exponential backoff."""
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return self._rng() * min(self.max_delay, self.base_delay * 2 ** attempt)
+
+    def pause(self, seconds: float):
+        """Holds back every worker for `seconds` (the renderer signalled overload)."""
+        with self._lock:
+            until = self._clock() + seconds
+            if until > self._pause_until:
+                self._pause_until = until
+                logger.warning(f"Renderer overloaded, pausing renders for {seconds:.1f}s")
+
+    def before_request(self) -> float:
+        """Returns how long to wait before sending; raises CircuitOpenError while the circuit is open."""
+        with self._lock:
+            now = self._clock()
+            if self.state == OPEN:
+                if now - self._opened_at < self.reset_timeout:
+                    raise CircuitOpenError(f"Grafana renderer unavailable ({self.failures} failures in a row)")
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == HALF_OPEN:
+                if self._probe_in_flight:
+                    raise CircuitOpenError("Grafana renderer unavailable, probe request in progress")
+                self._probe_in_flight = True
+            remaining = self._pause_until - now
+        if remaining <= 0:
+            return 0.0
+        return remaining + self._rng() * self.base_delay
+
+    def on_success(self):
+        """The renderer answered without a server error (429 included): closes the circuit."""
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info("Grafana renderer recovered, circuit closed")
+            self.state = CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def on_failure(self):
+        """Counts a failed render (5xx or connection error) towards opening the circuit."""
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self.state = OPEN
+                self._opened_at = self._clock()
+                logger.error(f"Grafana renderer failing ({self.failures} failures in a row), circuit opened for {self.reset_timeout:.0f}s")
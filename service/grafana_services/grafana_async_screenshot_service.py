@@ -0,0 +1,158 @@
+# service/grafana_services/grafana_async_screenshot_service.py
+
+import asyncio
+import threading
+import time
+import logging
+from typing import Callable, Dict, List, Optional
+from service.grafana_services.grafana_sceernshot_service import GrafanaScreenshotService
+from utils.tracing import NULL_TRACER, Tracer, host_of
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+class RunSlots:
+    """In-flight limit of one event loop whose size is re-read on every acquire (internal).
+
+    The asyncio counterpart of RenderScheduler.run_limit: the limit shrinks and grows as
+    other runs start and finish, which a fixed asyncio.Semaphore cannot do.
+    """
+
+    def __init__(self, limit: Callable[[], int]):
+        self.limit = limit
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit())
+            self.in_flight += 1
+            if self.in_flight < self.limit():
+                # The share may have grown since the last release: pass the wake-up on
+                self._condition.notify()
+
+    async def __aexit__(self, *exc_info):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+
+class AsyncGrafanaScreenshotService(GrafanaScreenshotService):
+    """asyncio backend for Grafana screenshots: one event loop per run.
+
+    Concurrent runs (e.g. several namespaces of a batch) each get an equal share of
+    Grafana_async_concurrency, like the thread backend shares Grafana_max_workers.
+    """
+
+    def __init__(self, config_manager):
+        super().__init__(config_manager)
+        self.async_concurrency = int(config_manager.get_value('Grafana_async_concurrency', '100'))
+        self._active_runs = 0
+        self._runs_lock = threading.Lock()
+
+    def run_concurrency(self) -> int:
+        """In-flight renders allowed for one run: Grafana_async_concurrency split fairly between active runs."""
+        with self._runs_lock:
+            active = max(1, self._active_runs)
+        return max(1, self.async_concurrency // active)
+
+    async def fetch_panel_screenshot_async(self, session, url: str, tracer: Tracer = NULL_TRACER) -> bytes:
+        """Fetches a single screenshot with the same retry semantics as fetch_panel_screenshot."""
+        import aiohttp
+
+        host = host_of(url)
+        for attempt in range(self.max_retries):
+            try:
+                pause = self.backoff.before_request()
+                if pause > 0:
+                    with tracer.span('overload_pause', 'wait'):
+                        await asyncio.sleep(pause)
+                delay = self.scheduler.bucket.reserve()
+                if delay > 0:
+                    with tracer.span('rate_limit_wait', 'wait'):
+                        await asyncio.sleep(delay)
+                started = time.monotonic()
+                with tracer.span('GET /render', 'http', host, attempt=attempt + 1):
+                    async with session.get(url) as response:
+                        status = response.status
+                        content = await response.read() if status == 200 else None
+                if status == 200:
+                    self.scheduler.limiter.on_success(time.monotonic() - started)
+                    self.backoff.on_success()
+                    return content
+                wait_time = self._retry_delay(status, attempt, response.headers.get('Retry-After'))
+                if wait_time is None:
+                    response.raise_for_status()
+                else:
+                    with tracer.span('retry_wait', 'wait', status=status):
+                        await asyncio.sleep(wait_time)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Request failed (attempt {attempt + 1}): {e}")
+                if not isinstance(e, aiohttp.ClientResponseError):
+                    self.backoff.on_failure()
+                if attempt < self.max_retries - 1:
+                    with tracer.span('retry_wait', 'wait', error=type(e).__name__):
+                        await asyncio.sleep(self.backoff.retry_delay(attempt))
+        raise Exception(f"Failed after {self.max_retries} attempts")
+
+    async def process_single_screenshot_async(self, session, slots: RunSlots, task: Dict, tracer: Tracer = NULL_TRACER) -> tuple:
+        """Processes a single screenshot task inside the event loop, serving it from the render cache when possible."""
+        url = self.build_task_url(task)
+        try:
+            with tracer.span('render', 'grafana', container=task['container'], graphic=task['graphic_name']):
+                content = await asyncio.to_thread(self.render_cache.get, url)
+                if content is None:
+                    async with slots:
+                        content = await self.fetch_panel_screenshot_async(session, url, tracer)
+                    await asyncio.to_thread(self.render_cache.put, url, content)
+                filepath = await asyncio.to_thread(self.store_screenshot, task, content)
+            return task['container'], task['graphic_name'], filepath, None
+        except Exception as error:
+            logger.error(f"Failed {task['container']}/{task['graphic_name']}: {error}")
+            return task['container'], task['graphic_name'], None, error
+
+    async def make_screenshots_async(self, containers: List[str], start_time: str, end_time: str, namespace: str,
+                                     on_result: Optional[Callable[[str, str, Optional[str], int, int], None]] = None,
+                                     tracer: Tracer = NULL_TRACER,
+                                     has_data: Optional[Callable[[str, str], bool]] = None) -> Dict[str, Dict[str, str]]:
+        """Generates screenshots concurrently from one event loop."""
+        try:
+            import aiohttp
+        except ImportError as error:
+            raise ImportError("Grafana_render_backend=async requires the aiohttp package") from error
+
+        self.screenshot_store.ensure_dir(namespace)
+        tasks = self._create_screenshot_tasks(containers, start_time, end_time, namespace, has_data)
+        results = {container: {} for container in containers}
+        errors = []
+        slots = RunSlots(self.run_concurrency)
+        connector = aiohttp.TCPConnector(limit=self.async_concurrency, limit_per_host=self.async_concurrency)
+        timeout = aiohttp.ClientTimeout(sock_connect=self.timeout[0], sock_read=self.timeout[1])
+        with self._runs_lock:
+            self._active_runs += 1
+        try:
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers={"Authorization": f"Bearer {self.grafana_token}"}) as session:
+                coroutines = [self.process_single_screenshot_async(session, slots, task, tracer) for task in tasks]
+                for done, coroutine in enumerate(asyncio.as_completed(coroutines), start=1):
+                    container, graphic_name, filepath, error = await coroutine
+                    if error:
+                        errors.append(f"{container}/{graphic_name}: {error}")
+                    elif filepath:
+                        results[container][graphic_name] = filepath
+                    if on_result:
+                        # Off the loop: the callback may block (e.g. a full upload queue) while renders keep going
+                        await asyncio.to_thread(on_result, container, graphic_name, filepath, done, len(tasks))
+        finally:
+            with self._runs_lock:
+                self._active_runs -= 1
+        if errors:
+            logger.warning(f"{len(errors)} errors occurred")
+        return {k: v for k, v in results.items() if v}
+
+    def make_screenshots(self, containers: List[str], start_time: str, end_time: str, namespace: str,
+                         on_result: Optional[Callable[[str, str, Optional[str], int, int], None]] = None,
+                         tracer: Tracer = NULL_TRACER,
+                         has_data: Optional[Callable[[str, str], bool]] = None) -> Dict[str, Dict[str, str]]:
+        """Generates screenshots on a private event loop (same result shape as the thread backend)."""
+        return asyncio.run(self.make_screenshots_async(containers, start_time, end_time, namespace, on_result, tracer, has_data))
@@ -1,13 +1,19 @@
 # service/grafana_screenshot_service.py
 
+import json
 import requests
-import os
 import time
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from io import BytesIO
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional, Union
 from utils.grafana_url_builder import build_grafana_url
+from utils.http_session import build_session, connection_stats
+from utils.tracing import NULL_TRACER, Tracer, host_of
+from service.grafana_services.render_scheduler import RenderScheduler
+from service.grafana_services.backoff_controller import BackoffController, parse_retry_after
+from service.grafana_services.render_cache import RenderCache
+from service.grafana_services.panel_catalog import PanelCatalog
+from service.grafana_services.screenshot_store import RenderedImage, ScreenshotStore
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -16,6 +22,7 @@ class GrafanaScreenshotService:
     """Service for fetching and saving Grafana screenshots."""
 
     def __init__(self, config_manager):
+        self.config = config_manager
         self.max_workers = int(config_manager.get_value('Grafana_max_workers', '10'))
         self.request_delay = float(config_manager.get_value('Grafana_request_delay', '0.5'))
         self.max_retries = int(config_manager.get_value('Grafana_max_retries', '3'))
@@ -25,90 +32,192 @@ class GrafanaScreenshotService:
         uid = config_manager.get_value('Grafana_dashboard_uid')
         slug = config_manager.get_value('Grafana_dashboard_slug')
         self.base_dashboard_url = f"{host}:{port}/render/d-solo/{uid}/{slug}"
+        # Token bucket replaces the old sleep between batches; by default it allows
+        # the same average rate as batches of min(max_workers * 2, 10) per request_delay
+        rate = float(config_manager.get_value('Grafana_rate_limit', '0') or 0)
+        if rate <= 0 and self.request_delay > 0:
+            rate = min(self.max_workers * 2, 10) / self.request_delay
+        target_latency = float(config_manager.get_value('Grafana_target_latency', '15'))
+        self.scheduler = RenderScheduler(self.max_workers, rate, target_latency)
+        # Shared by all render workers: jittered retries, global pause on overload, circuit breaker
+        self.backoff = BackoffController(
+            base_delay=float(config_manager.get_value('Grafana_backoff_base', '1')),
+            max_delay=float(config_manager.get_value('Grafana_backoff_max', '60')),
+            failure_threshold=int(config_manager.get_value('Grafana_circuit_failures', '10')),
+            reset_timeout=float(config_manager.get_value('Grafana_circuit_reset', '30')),
+        )
+        self.timeout = (
+            float(config_manager.get_value('Grafana_connect_timeout', '10')),
+            float(config_manager.get_value('Grafana_read_timeout', '60')),
+        )
+        # One keep-alive pool per service, sized for every render thread
+        self.session = build_session(self.max_workers, headers={"Authorization": f"Bearer {self.grafana_token}"})
+        cache_dir = config_manager.get_value('Grafana_cache_dir', './.render_cache')
+        cache_max_mb = float(config_manager.get_value('Grafana_cache_max_mb', '1024') or 0)
+        self.render_cache = RenderCache(cache_dir, int(cache_max_mb * 1024 * 1024))
+        # Panel ids come from the dashboard JSON, refreshed only when the dashboard version changes
+        panel_rules = config_manager.get_value('Grafana_panel_rules', '')
+        self.panel_catalog = PanelCatalog(
+            self.session, f"{host}:{port}", uid, cache_dir,
+            float(config_manager.get_value('Grafana_panel_catalog_ttl', '600')), self.timeout,
+            json.loads(panel_rules) if panel_rules else None,
+        )
+        # With a memory budget, rendered bytes go to the uploader directly; disk is an optional archive
+        memory_budget_mb = float(config_manager.get_value('Grafana_memory_budget_mb', '0') or 0)
+        archive = config_manager.get_value('Grafana_archive_to_disk', 'true').lower() == 'true'
+        self.screenshot_store = ScreenshotStore(int(memory_budget_mb * 1024 * 1024), archive)
 
     def fetch_panel_screenshot(self, url: str) -> BytesIO:
         """Fetches a single screenshot with retries."""
-        headers = {"Authorization": f"Bearer {self.grafana_token}"}
+        return BytesIO(self.fetch_panel_content(url))
+
+    def fetch_panel_content(self, url: str, tracer: Tracer = NULL_TRACER) -> bytes:
+        """Fetches the raw bytes of a single screenshot with retries."""
+        host = host_of(url)
         for attempt in range(self.max_retries):
             try:
-                response = requests.get(url, headers=headers, timeout=60)
+                pause = self.backoff.before_request()
+                if pause > 0:
+                    with tracer.span('overload_pause', 'wait'):
+                        time.sleep(pause)
+                delay = self.scheduler.bucket.reserve()
+                if delay > 0:
+                    with tracer.span('rate_limit_wait', 'wait'):
+                        time.sleep(delay)
+                started = time.monotonic()
+                with tracer.span('GET /render', 'http', host, attempt=attempt + 1):
+                    response = self.session.get(url, timeout=self.timeout)
                 if response.status_code == 200:
-                    return BytesIO(response.content)
-                elif response.status_code == 429:
-                    wait_time = (attempt + 1) * 10
-                    logger.warning(f"Rate limit. Waiting {wait_time}s")
-                    time.sleep(wait_time)
-                elif response.status_code >= 500:
-                    wait_time = (attempt + 1) * 5
-                    logger.warning(f"Server error {response.status_code}. Waiting {wait_time}s")
-                    time.sleep(wait_time)
-                else:
+                    self.scheduler.limiter.on_success(time.monotonic() - started)
+                    self.backoff.on_success()
+                    return response.content
+                wait_time = self._retry_delay(response.status_code, attempt, response.headers.get('Retry-After'))
+                if wait_time is None:
                     response.raise_for_status()
+                else:
+                    with tracer.span('retry_wait', 'wait', status=response.status_code):
+                        time.sleep(wait_time)
             except requests.exceptions.RequestException as e:
                 logger.warning(f"Request failed (attempt {attempt + 1}): {e}")
+                if not isinstance(e, requests.exceptions.HTTPError):
+                    self.backoff.on_failure()
                 if attempt < self.max_retries - 1:
-                    time.sleep((attempt + 1) * 5)
+                    with tracer.span('retry_wait', 'wait', error=type(e).__name__):
+                        time.sleep(self.backoff.retry_delay(attempt))
         raise Exception(f"Failed after {self.max_retries} attempts")
 
+    def _retry_delay(self, status_code: int, attempt: int, retry_after: Optional[str] = None) -> Optional[float]:
+        """Returns the wait before retrying a failed render status, None if the status is not retried (internal)."""
+        retry_after_seconds = parse_retry_after(retry_after)
+        if status_code == 429 or (status_code == 503 and retry_after_seconds is not None):
+            # Overload signal: the renderer is alive but every worker has to back off, not just this one
+            if status_code == 429:
+                self.scheduler.limiter.on_throttled()
+            self.backoff.on_success()
+            wait_time = self.backoff.retry_delay(attempt, retry_after_seconds)
+            self.backoff.pause(wait_time)
+            logger.warning(f"Rate limit ({status_code}). Waiting {wait_time:.1f}s")
+            return wait_time
+        if status_code >= 500:
+            self.backoff.on_failure()
+            wait_time = self.backoff.retry_delay(attempt, retry_after_seconds)
+            logger.warning(f"Server error {status_code}. Waiting {wait_time:.1f}s")
+            return wait_time
+        self.backoff.on_success()
+        return None
+
     def save_graphic_to_dir(self, content: bytes, directory: str, filename: str):
         """Saves screenshot to file."""
-        os.makedirs(directory, exist_ok=True)
-        filepath = os.path.join(directory, filename)
-        with open(filepath, 'wb') as file:
-            file.write(content)
-
-    def process_single_screenshot(self, task: Dict) -> tuple:
-        """Processes a single screenshot task."""
-        url = build_grafana_url(task['namespace'], task['panel_id'], task['container'], task['start_time'], task['end_time'], self.base_dashboard_url)
+        self.screenshot_store.write(content, directory, filename)
+
+    def store_screenshot(self, task: Dict, content: bytes) -> Union[str, RenderedImage]:
+        """Saves rendered content for a task and returns its path, or an in-memory image within the memory budget."""
+        filename = f"{task['container']}-{task['graphic_name']}.png"
+        if self.screenshot_store.enabled:
+            image = self.screenshot_store.put(content, task['namespace'], filename)
+            logger.info(f"Rendered: {image!r}")
+            return image
+        self.save_graphic_to_dir(content, task['namespace'], filename)
+        filepath = f"{task['namespace']}/{filename}"
+        logger.info(f"Saved: {filepath}")
+        return filepath
+
+    def build_task_url(self, task: Dict) -> str:
+        """Builds the render URL of a task."""
+        return build_grafana_url(task['namespace'], task['panel_id'], task['container'], task['start_time'], task['end_time'], self.base_dashboard_url, self.config)
+
+    def process_single_screenshot(self, task: Dict, tracer: Tracer = NULL_TRACER) -> tuple:
+        """Processes a single screenshot task, serving it from the render cache when possible."""
+        url = self.build_task_url(task)
         try:
-            image_content = self.fetch_panel_screenshot(url)
-            filename = f"{task['container']}-{task['graphic_name']}.png"
-            self.save_graphic_to_dir(image_content.getvalue(), task['namespace'], filename)
-            filepath = f"{task['namespace']}/{filename}"
-            logger.info(f"Saved: {filepath}")
+            with tracer.span('render', 'grafana', container=task['container'], graphic=task['graphic_name']):
+                content = self.render_cache.get(url)
+                if content is None:
+                    content = self.fetch_panel_content(url, tracer)
+                    self.render_cache.put(url, content)
+                filepath = self.store_screenshot(task, content)
             return task['container'], task['graphic_name'], filepath, None
         except Exception as error:
             logger.error(f"Failed {task['container']}/{task['graphic_name']}: {error}")
             return task['container'], task['graphic_name'], None, error
 
-    def make_screenshots(self, containers: List[str], start_time: str, end_time: str, namespace: str) -> Dict[str, Dict[str, str]]:
-        """Generates screenshots in batches."""
-        os.makedirs(namespace, exist_ok=True)
-        tasks = self._create_screenshot_tasks(containers, start_time, end_time, namespace)
+    def make_screenshots(self, containers: List[str], start_time: str, end_time: str, namespace: str,
+                         on_result: Optional[Callable[[str, str, Optional[str], int, int], None]] = None,
+                         tracer: Tracer = NULL_TRACER,
+                         has_data: Optional[Callable[[str, str], bool]] = None) -> Dict[str, Dict[str, str]]:
+        """Generates screenshots through the pipelined render scheduler.
+
+        on_result(container, graphic_name, filepath, done, total) is called as each task finishes
+        (filepath is None on failure), so callers can stream results before the whole pass ends.
+        has_data(container, graphic_name) filters out panels known to be empty in the window.
+        """
+        self.screenshot_store.ensure_dir(namespace)
+        tasks = self._create_screenshot_tasks(containers, start_time, end_time, namespace, has_data)
         results = {container: {} for container in containers}
         errors = []
-        batch_size = min(self.max_workers * 2, 10)
-        for i in range(0, len(tasks), batch_size):
-            batch = tasks[i:i + batch_size]
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                futures = [executor.submit(self.process_single_screenshot, task) for task in batch]
-                for future in as_completed(futures):
-                    container, graphic_name, filepath, error = future.result()
-                    if error:
-                        errors.append(f"{container}/{graphic_name}: {error}")
-                    elif filepath:
-                        results[container][graphic_name] = filepath
-            if i + batch_size < len(tasks):
-                time.sleep(self.request_delay)
+        done = 0
+
+        def collect(result: tuple):
+            nonlocal done
+            container, graphic_name, filepath, error = result
+            done += 1
+            if error:
+                errors.append(f"{container}/{graphic_name}: {error}")
+            elif filepath:
+                results[container][graphic_name] = filepath
+            if on_result:
+                on_result(container, graphic_name, filepath, done, len(tasks))
+
+        self.scheduler.run(tasks, lambda task: self.process_single_screenshot(task, tracer), collect)
         if errors:
             logger.warning(f"{len(errors)} errors occurred")
+        logger.info(f"Grafana connections: {self.connection_stats()}, render cache hits/misses: {self.render_cache.hits}/{self.render_cache.misses}")
         return {k: v for k, v in results.items() if v}
 
-    def _create_screenshot_tasks(self, containers: List[str], start_time: str, end_time: str, namespace: str) -> List[Dict]:
-        """Creates tasks for screenshots (internal)."""
-        panel_ids = {  # From original
-            'cpu-usage-percent': 5, 'cpu-usage-limit-(millicores)': 6, 'cpu-throttled-(millicores)': 43,
-            # ... (all others as in original)
-            'threads-count': 54
-        }
-        excpanel = {'heap-(bytes)', 'heap-per-pool-(bytes)', 'nonHeap-per-pool-(bytes)', 'metaspace-(bytes)', 'gc-collection-count-time', 'threads-count'}
+    def connection_stats(self) -> Dict[str, int]:
+        """Returns request/connection counters of the render session."""
+        return connection_stats(self.session)
+
+    def close(self):
+        """Stops the render thread pool and closes pooled connections."""
+        self.scheduler.shutdown()
+        self.session.close()
+
+    def _create_screenshot_tasks(self, containers: List[str], start_time: str, end_time: str, namespace: str,
+                                 has_data: Optional[Callable[[str, str], bool]] = None) -> List[Dict]:
+        """Creates tasks for screenshots, skipping panels without data (internal)."""
+        panels = self.panel_catalog.panels()
         tasks = []
+        skipped = 0
         for container in containers:
-            for graphic_name, panel_id in panel_ids.items():
-                if (container.__contains__('ingress') or container.__contains__('egress')) and graphic_name in excpanel:
+            for graphic_name, panel_id in self.panel_catalog.panels_for(container, panels).items():
+                if has_data and not has_data(container, graphic_name):
+                    skipped += 1
                     continue
                 tasks.append({
                     'container': container, 'graphic_name': graphic_name, 'panel_id': panel_id,
                     'namespace': namespace, 'start_time': start_time, 'end_time': end_time
                 })
+        if skipped:
+            logger.info(f"Skipped {skipped} of {skipped + len(tasks)} panels without data in the window")
         return tasks
\ No newline at end of file
@@ -0,0 +1,162 @@
+# service/grafana_services/panel_catalog.py
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import logging
+from fnmatch import fnmatch
+from typing import Dict, List, Optional
+
+from utils.confluence_graphics_sorter import ALL_METRICS_ORDER
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# Fallback while the dashboard JSON cannot be fetched (the previously hardcoded list)
+STATIC_PANEL_IDS = {
+    'cpu-usage-percent': 5, 'cpu-usage-limit-(millicores)': 6, 'cpu-throttled-(millicores)': 43,
+    'threads-count': 54,
+}
+
+# Per container type include/exclude rules, fnmatch patterns over container names and panel slugs.
+# Overridable with Grafana_panel_rules (same structure as JSON). The default keeps JVM panels off ingress/egress.
+DEFAULT_PANEL_RULES = [
+    {
+        'containers': ['*ingress*', '*egress*'],
+        'exclude': ['heap-(bytes)', 'heap-per-pool-(bytes)', 'nonHeap-per-pool-(bytes)', 'metaspace-(bytes)',
+                    'gc-collection-count-time', 'threads-count'],
+    },
+]
+
+# Panel types that render as charts; text, stat, table etc. panels are not part of the report
+GRAPH_PANEL_TYPES = ('graph', 'timeseries')
+
+_CANONICAL_SLUGS = {slug.lower(): slug for slug in ALL_METRICS_ORDER}
+
+
+def panel_slug(title: str) -> str:
+    """Graphic name of a panel title, e.g. "CPU usage limit (millicores)" -> "cpu-usage-limit-(millicores)" (utility)."""
+    slug = re.sub(r'[\s/,]+', '-', title.strip()).strip('-')
+    return _CANONICAL_SLUGS.get(slug.lower(), slug.lower())
+
+
+def iter_dashboard_panels(panels: List[Dict]):
+    """Yields graph panels of a dashboard, including those nested in collapsed rows (utility)."""
+    for panel in panels or []:
+        if panel.get('type') == 'row':
+            yield from iter_dashboard_panels(panel.get('panels'))
+        elif panel.get('type') in GRAPH_PANEL_TYPES and panel.get('id') is not None and panel.get('title'):
+            yield panel
+
+
+def panels_from_dashboard(dashboard: Dict) -> Dict[str, int]:
+    """slug -> panel id for every titled graph panel of a dashboard model; the first panel wins on duplicate titles."""
+    panels = {}
+    for panel in iter_dashboard_panels(dashboard.get('panels')):
+        slug = panel_slug(panel['title'])
+        if slug in panels:
+            logger.warning(f"Duplicate panel title '{panel['title']}' (ids {panels[slug]} and {panel['id']}), keeping the first")
+            continue
+        panels[slug] = int(panel['id'])
+    return panels
+
+
+class PanelCatalog:
+    """Panels of the Grafana dashboard, discovered from its JSON model and cached by dashboard version.
+
+    The catalog is kept in memory and on disk; within `ttl` seconds no request is made at all,
+    after that one lightweight versions request decides whether the full model is fetched again.
+    """
+
+    def __init__(self, session, grafana_url: str, uid: str, cache_dir: Optional[str], ttl: float,
+                 timeout=None, rules: Optional[List[Dict]] = None):
+        self.session = session
+        self.grafana_url = grafana_url.rstrip('/')
+        self.uid = uid
+        self.ttl = ttl
+        self.timeout = timeout
+        self.rules = DEFAULT_PANEL_RULES if rules is None else rules
+        cache_key = hashlib.sha256(f"{self.grafana_url}|{uid}".encode('utf-8')).hexdigest()[:16]
+        self.cache_path = os.path.join(cache_dir, f"panel_catalog_v2_{cache_key}.json") if cache_dir else None
+        self.version = None
+        self._panels: Optional[Dict[str, int]] = None
+        self._checked = 0.0  # time.time() of the last fetch or version check
+        self._lock = threading.Lock()
+        self._load()
+
+    def panels(self) -> Dict[str, int]:
+        """slug -> panel id of the current dashboard version, STATIC_PANEL_IDS if it was never fetched."""
+        with self._lock:
+            if self._panels is None or time.time() - self._checked > self.ttl:
+                try:
+                    self._refresh()
+                except Exception as error:
+                    logger.warning(f"Could not load panels of dashboard {self.uid}: {error}")
+                    self._checked = time.time()  # do not retry on every call while Grafana is down
+            return dict(self._panels) if self._panels is not None else dict(STATIC_PANEL_IDS)
+
+    def panels_for(self, container: str, panels: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+        """Panels to render for a container after the include/exclude rules of its container type."""
+        panels = self.panels() if panels is None else panels
+        for rule in self.rules:
+            if not any(fnmatch(container, pattern) for pattern in rule.get('containers', ['*'])):
+                continue
+            include = rule.get('include')
+            exclude = rule.get('exclude', [])
+            panels = {
+                slug: panel_id for slug, panel_id in panels.items()
+                if (include is None or any(fnmatch(slug, pattern) for pattern in include))
+                and not any(fnmatch(slug, pattern) for pattern in exclude)
+            }
+        return panels
+
+    def _refresh(self):
+        """Fetches the model only if the dashboard version changed since the cached one (internal)."""
+        if self._panels is not None and self.version is not None and self._latest_version() == self.version:
+            self._checked = time.time()
+            self._save()
+            return
+        response = self.session.get(f"{self.grafana_url}/api/dashboards/uid/{self.uid}", timeout=self.timeout)
+        response.raise_for_status()
+        dashboard = response.json()['dashboard']
+        self._panels = panels_from_dashboard(dashboard)
+        self.version = dashboard.get('version')
+        self._checked = time.time()
+        logger.info(f"Dashboard {self.uid} version {self.version}: {len(self._panels)} panels")
+        self._save()
+
+    def _latest_version(self) -> Optional[int]:
+        response = self.session.get(f"{self.grafana_url}/api/dashboards/uid/{self.uid}/versions",
+                                    params={'limit': 1}, timeout=self.timeout)
+        if response.status_code != 200:
+            return None
+        versions = response.json()
+        # Grafana 11 wraps the list in {"versions": [...]}
+        if isinstance(versions, dict):
+            versions = versions.get('versions', [])
+        return versions[0].get('version') if versions else None
+
+    def _load(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as file:
+                cached = json.load(file)
+            self._panels = {slug: int(panel_id) for slug, panel_id in cached['panels'].items()}
+            self.version = cached.get('version')
+            self._checked = float(cached.get('checked', 0))
+        except (OSError, ValueError, KeyError) as error:
+            logger.warning(f"Ignoring panel catalog cache {self.cache_path}: {error}")
+
+    def _save(self):
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            with open(self.cache_path, 'w', encoding='utf-8') as file:
+                json.dump({'grafana_url': self.grafana_url, 'uid': self.uid, 'version': self.version, 'checked': self._checked, 'panels': self._panels}, file, indent=2)
+        except OSError as error:
+            logger.warning(f"Could not write panel catalog cache {self.cache_path}: {error}")
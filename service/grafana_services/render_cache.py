@@ -0,0 +1,122 @@
+# service/grafana_services/render_cache.py
+
+import hashlib
+import os
+import threading
+import time
+import urllib.parse
+import logging
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# Query params that do not change the rendered image
+VOLATILE_PARAMS = {'refresh', '_dash.hideTimePicker', 'kiosk'}
+
+
+def normalize_render_url(url: str) -> str:
+    """Drops volatile params and sorts the rest so equal renders get equal keys."""
+    parsed = urllib.parse.urlparse(url)
+    params = [(k, v) for k, v in urllib.parse.parse_qsl(parsed.query, keep_blank_values=True) if k not in VOLATILE_PARAMS]
+    return parsed._replace(query=urllib.parse.urlencode(sorted(params))).geturl()
+
+
+def is_cacheable(url: str, now_ms: Optional[int] = None) -> bool:
+    """Only finished absolute time windows render the same image twice; relative now-… ranges and
+    windows ending in the future (data still arriving) are bypassed."""
+    params = urllib.parse.parse_qs(urllib.parse.urlparse(url).query)
+    if any(value.startswith('now') for key in ('from', 'to') for value in params.get(key, ['now'])):
+        return False
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    return all(not value.isdigit() or int(value) <= now_ms for value in params['to'])
+
+
+class RenderCache:
+    """Content-addressed on-disk cache of rendered panels with size-bounded LRU eviction."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> size, least recently used first
+        self._total = 0
+        self._lock = threading.Lock()
+        if self.enabled:
+            os.makedirs(directory, exist_ok=True)
+            self._load_index()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _load_index(self):
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith('.png'):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total += size
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.png")
+
+    @staticmethod
+    def key_for(url: str) -> str:
+        return hashlib.sha256(normalize_render_url(url).encode('utf-8')).hexdigest()
+
+    def get(self, url: str) -> Optional[bytes]:
+        """Returns cached content for a render URL, None on miss or bypass."""
+        if not self.enabled or not is_cacheable(url):
+            return None
+        key = self.key_for(url)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+        try:
+            with open(self._path(key), 'rb') as file:
+                content = file.read()
+            os.utime(self._path(key))
+        except OSError:
+            with self._lock:
+                self._total -= self._entries.pop(key, 0)
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return content
+
+    def put(self, url: str, content: bytes):
+        """Stores content for a render URL and evicts least recently used entries over the size limit."""
+        if not self.enabled or not is_cacheable(url) or len(content) > self.max_bytes:
+            return
+        key = self.key_for(url)
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as file:
+                file.write(content)
+            os.replace(tmp_path, path)
+        except OSError as error:
+            logger.warning(f"Render cache write failed: {error}")
+            return
+        evicted = []
+        with self._lock:
+            self._total -= self._entries.pop(key, 0)
+            self._entries[key] = len(content)
+            self._total += len(content)
+            while self._total > self.max_bytes and len(self._entries) > 1:
+                old_key, size = self._entries.popitem(last=False)
+                self._total -= size
+                evicted.append(old_key)
+        for old_key in evicted:
+            try:
+                os.remove(self._path(old_key))
+            except OSError:
+                pass
@@ -0,0 +1,120 @@
+# service/grafana_services/render_scheduler.py
+
+import threading
+import time
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+class TokenBucket:
+    """Token bucket limiting the rate at which render requests are started."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Takes one token now (the balance may go negative) and returns the delay until it is valid."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit of in-flight renders driven by Grafana latency and 429 responses."""
+
+    def __init__(self, initial: int, minimum: int, maximum: int, target_latency: float):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.target_latency = target_latency
+        self._limit = float(min(max(initial, self.minimum), self.maximum))
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def on_success(self, latency: float):
+        """Grows the limit by ~1 per window while latency is on target, shrinks it otherwise."""
+        with self._lock:
+            if latency <= self.target_latency:
+                self._limit = min(self.maximum, self._limit + 1 / self._limit)
+            else:
+                self._limit = max(self.minimum, self._limit * 0.9)
+
+    def on_throttled(self):
+        """Halves the limit after a 429 from the renderer."""
+        with self._lock:
+            self._limit = max(self.minimum, self._limit / 2)
+            logger.info(f"Render concurrency reduced to {self.limit}")
+
+
+class RenderScheduler:
+    """Continuous work-queue scheduler over one long-lived thread pool.
+
+    Concurrent run() calls (e.g. several namespaces of a batch) share the pool and the
+    in-flight limit: each active run gets an equal share of limiter.limit.
+    """
+
+    def __init__(self, max_workers: int, rate: float, target_latency: float):
+        self.max_workers = max(1, max_workers)
+        self.bucket = TokenBucket(rate, self.max_workers)
+        self.limiter = AdaptiveConcurrencyLimiter(self.max_workers, 1, self.max_workers, target_latency)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._active_runs = 0
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='grafana-render')
+            return self._executor
+
+    def run_limit(self) -> int:
+        """In-flight calls allowed for one run: the global limit split fairly between active runs."""
+        with self._lock:
+            active = max(1, self._active_runs)
+        return max(1, self.limiter.limit // active)
+
+    def run(self, tasks: Iterable[Any], func: Callable[[Any], Any],
+            on_result: Optional[Callable[[Any], None]] = None) -> List[Any]:
+        """Runs func over tasks keeping up to limiter.limit calls in flight, results in completion order."""
+        queue = deque(tasks)
+        pending = set()
+        results = []
+        with self._lock:
+            self._active_runs += 1
+        try:
+            while queue or pending:
+                while queue and len(pending) < self.run_limit():
+                    pending.add(self.executor.submit(func, queue.popleft()))
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    results.append(result)
+                    if on_result:
+                        on_result(result)
+        finally:
+            with self._lock:
+                self._active_runs -= 1
+        return results
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
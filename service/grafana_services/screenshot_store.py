@@ -0,0 +1,88 @@
+# service/grafana_services/screenshot_store.py
+
+import os
+import threading
+import logging
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+class RenderedImage(os.PathLike):
+    """A rendered panel held in memory or on disk.
+
+    Behaves like its relative path "<namespace>/<file>.png" wherever only the name is needed,
+    so content building works the same as with plain path strings.
+    """
+
+    def __init__(self, relpath: str, data: Optional[memoryview], path: Optional[str], store: 'ScreenshotStore'):
+        self.relpath = relpath
+        self.data = data
+        self.path = path
+        self.size = len(data) if data is not None else 0
+        self._store = store
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.relpath)
+
+    def __fspath__(self) -> str:
+        return self.relpath
+
+    def __str__(self) -> str:
+        return self.relpath
+
+    def __repr__(self) -> str:
+        where = 'memory' if self.data is not None else 'disk' if self.path else 'released'
+        return f"RenderedImage({self.relpath!r}, {where})"
+
+    def release(self):
+        """Drops the in-memory bytes once they are no longer needed (e.g. after upload)."""
+        if self.data is not None:
+            self.data = None
+            self._store.free(self.size)
+
+
+class ScreenshotStore:
+    """Keeps rendered bytes in memory up to a byte budget, spilling to disk beyond it."""
+
+    def __init__(self, memory_budget: int, archive: bool):
+        self.memory_budget = memory_budget
+        self.archive = archive
+        self.used = 0
+        self._created_dirs = set()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.memory_budget > 0
+
+    def ensure_dir(self, directory: str):
+        """Creates a directory once per store instead of once per file."""
+        if directory not in self._created_dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._created_dirs.add(directory)
+
+    def write(self, content: Union[bytes, memoryview], directory: str, filename: str) -> str:
+        self.ensure_dir(directory)
+        filepath = os.path.join(directory, filename)
+        with open(filepath, 'wb') as file:
+            file.write(content)
+        return filepath
+
+    def put(self, content: bytes, directory: str, filename: str) -> RenderedImage:
+        """Wraps content without copying; writes it to disk when archiving or over budget."""
+        relpath = f"{directory}/{filename}"
+        with self._lock:
+            in_memory = self.used + len(content) <= self.memory_budget
+            if in_memory:
+                self.used += len(content)
+        path = self.write(content, directory, filename) if self.archive or not in_memory else None
+        if not in_memory:
+            logger.info(f"Memory budget exhausted, spilled {relpath} to disk")
+        return RenderedImage(relpath, memoryview(content) if in_memory else None, path, self)
+
+    def free(self, size: int):
+        with self._lock:
+            self.used = max(0, self.used - size)
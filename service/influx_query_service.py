@@ -1,14 +1,45 @@
 # service/influx_query_service.py
 
+import math
+import threading
 import time
+import numpy as np
 from influxdb import InfluxDBClient
-from typing import List
-from config import config
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from utils.downsampling import MinMaxAccumulator
+from utils.parse_utils import to_influx_time
 import logging
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# namespace -> containers, shared by every service instance (and so across report runs)
+_containers_cache: Dict[Tuple, Tuple[float, List[str]]] = {}
+_containers_cache_lock = threading.Lock()
+
+
+def _quote(value: str) -> str:
+    return value.replace('\\', '\\\\').replace("'", "\\'")
+
+
+def _quote_identifier(name: str) -> str:
+    return '"' + name.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def _time_conditions(start_time: Optional[str], end_time: Optional[str]) -> str:
+    conditions = ''
+    if start_time:
+        conditions += f" AND time > {to_influx_time(start_time)}"
+    if end_time:
+        conditions += f" AND time < {to_influx_time(end_time)}"
+    return conditions
+
+
+def _window(start_time: Optional[str], end_time: Optional[str]) -> str:
+    # Subqueries with GROUP BY time() need the time range on every level
+    return _time_conditions(start_time, end_time)[len(' AND '):] or 'time > now() - 1h'
+
+
 class InfluxQueryService:
     """Service for querying InfluxDB."""
 
@@ -20,13 +51,248 @@ class InfluxQueryService:
             config_manager.get_value('Influxdb_password'),
             config_manager.get_value('Influxdb_database')
         )
+        self.cache_scope = (
+            config_manager.get_value('Influxdb_url'),
+            config_manager.get_value('Influxdb_port'),
+            config_manager.get_value('Influxdb_database'),
+        )
+        self.discovery_timeout = float(config_manager.get_value('Influxdb_discovery_timeout', '60'))
+        self.discovery_retry_interval = float(config_manager.get_value('Influxdb_discovery_retry_interval', '3'))
+        self.cache_ttl = float(config_manager.get_value('Influxdb_cache_ttl', '300'))
 
-    def get_containers(self, namespace: str) -> List[str]:
-        """Gets containers from InfluxDB."""
-        containers = list(self.client.query(f"SHOW TAG VALUES WITH KEY = instance WHERE namespace = '{namespace}'"))
-        if len(containers) < 1:
+    def get_containers(self, namespace: str, start_time: Optional[str] = None, end_time: Optional[str] = None) -> List[str]:
+        """Gets containers that emitted data in the [start_time, end_time] window.
+
+        Retries while InfluxDB has no data yet, up to Influxdb_discovery_timeout seconds,
+        and caches the result for Influxdb_cache_ttl seconds.
+        """
+        key = (*self.cache_scope, namespace, start_time, end_time)
+        with _containers_cache_lock:
+            cached = _containers_cache.get(key)
+            if cached and cached[0] > time.monotonic():
+                return list(cached[1])
+
+        query = f"SHOW TAG VALUES WITH KEY = \"instance\" WHERE \"namespace\" = '{_quote(namespace)}'"
+        query += _time_conditions(start_time, end_time)
+
+        deadline = time.monotonic() + self.discovery_timeout
+        while True:
+            containers = sorted({point['value'] for point in self.client.query(query).get_points()})
+            if containers:
+                break
+            if time.monotonic() + self.discovery_retry_interval > deadline:
+                raise TimeoutError(f"No containers found for namespace '{namespace}' within {self.discovery_timeout:.0f}s")
             logger.info("No data. Retrying...")
-            time.sleep(3)
-            return self.get_containers(namespace)
-        else:
-            return [list(i.values())[1] for i in containers[-1]]
\ No newline at end of file
+            time.sleep(self.discovery_retry_interval)
+
+        with _containers_cache_lock:
+            _containers_cache[key] = (time.monotonic() + self.cache_ttl, containers)
+        return list(containers)
+
+    def get_measurements_with_data(self, namespace: str, measurements: Iterable[str],
+                                   start_time: Optional[str] = None, end_time: Optional[str] = None) -> Optional[Dict[str, Set[str]]]:
+        """Maps each container to the given measurements that have points in the window.
+
+        One query for the whole namespace (a count per measurement and instance); None if it fails,
+        so callers can fall back to rendering everything.
+        """
+        measurements = sorted(set(measurements))
+        if not measurements:
+            return {}
+        query = (f"SELECT count(*) FROM {', '.join(_quote_identifier(m) for m in measurements)}"
+                 f" WHERE \"namespace\" = '{_quote(namespace)}'")
+        query += _time_conditions(start_time, end_time)
+        query += ' GROUP BY "instance"'
+        try:
+            result = self.client.query(query)
+        except Exception as error:
+            logger.warning(f"Data pre-check failed for namespace '{namespace}', rendering all panels: {error}")
+            return None
+        available: Dict[str, Set[str]] = {}
+        for (measurement, tags), points in result.items():
+            instance = (tags or {}).get('instance')
+            # count(*) returns one count_<field> column per field; any non-zero count means data
+            if instance and any(value for point in points for key, value in point.items() if key.startswith('count')):
+                available.setdefault(instance, set()).add(measurement)
+        return available
+
+    def get_panel_series(self, namespace: str, spec: Dict, start_time: Optional[str], end_time: Optional[str],
+                         interval_s: int, aggregate: str = 'mean') -> Dict[str, Dict[str, Tuple[np.ndarray, np.ndarray]]]:
+        """Series of one panel spec for every container of the namespace, downsampled by InfluxDB itself.
+
+        aggregate='mean' returns one averaged point per interval_s bucket; 'minmax' returns the min and
+        max of each 2 * interval_s bucket, so spikes survive at the same number of points.
+        Counters are drawn as per-second rates and sum_by series are added up per bucket.
+        One request per spec, one statement per series (see utils.panel_metrics);
+        returns {container: {label: (times_ms, values)}}.
+        """
+        interval_s = max(1, int(interval_s))
+        statements = [self._series_statement(namespace, item, start_time, end_time, interval_s, aggregate) for item in spec['series']]
+        results = self.client.query(';'.join(statements), epoch='ms')
+        if not isinstance(results, list):
+            results = [results]
+        bucket_s = interval_s * (2 if aggregate == 'minmax' else 1)
+        series: Dict[str, Dict[str, Tuple[np.ndarray, np.ndarray]]] = {}
+        for item, result in zip(spec['series'], results):
+            self._add_bucketed(series, item, len(spec['series']) > 1, result.raw.get('series', []), bucket_s, aggregate)
+        return series
+
+    def get_panel_series_raw(self, namespace: str, spec: Dict, start_time: str, end_time: str, start_ms: int, end_ms: int,
+                             points: int, chunk_size: int = 10000) -> Dict[str, Dict[str, Tuple[np.ndarray, np.ndarray]]]:
+        """Raw series of one panel spec, downsampled client-side to `points` points per line.
+
+        The response is read in chunks of chunk_size points and folded into per-bucket min/max
+        (utils.downsampling.MinMaxAccumulator) before a final LTTB pass, so memory scales with
+        `points`, not with the length of the test. Counters become point-to-point per-second rates;
+        sum_by series can only be added up on aligned buckets and are averaged by InfluxDB instead.
+        """
+        multi = len(spec['series']) > 1
+        interval_s = max(1, math.ceil((end_ms - start_ms) / 1000 / max(1, points)))
+        series: Dict[str, Dict[str, Tuple[np.ndarray, np.ndarray]]] = {}
+        for item in spec['series']:
+            if item['sum_by']:
+                result = self.client.query(self._series_statement(namespace, item, start_time, end_time, interval_s, 'mean'), epoch='ms')
+                self._add_bucketed(series, item, multi, result.raw.get('series', []), interval_s, 'mean')
+                continue
+            group_by = ['"instance"'] + [_quote_identifier(tag) for tag in item['group_by']]
+            query = (f"SELECT {_quote_identifier(item['field'])} FROM {_quote_identifier(item['measurement'])}"
+                     f" WHERE {self._panel_conditions(namespace, item)}{_time_conditions(start_time, end_time)}"
+                     f" GROUP BY {', '.join(group_by)}")
+            accumulators: Dict[Tuple, MinMaxAccumulator] = {}
+            tag_sets: Dict[Tuple, Dict] = {}
+            last_points: Dict[Tuple, Tuple[float, float]] = {}
+            for chunk in self.client.query(query, epoch='ms', chunked=True, chunk_size=chunk_size):
+                for raw in chunk.raw.get('series', []):
+                    if not raw.get('values'):
+                        continue
+                    tags = raw.get('tags') or {}
+                    key = tuple(sorted(tags.items()))
+                    values = np.array(raw['values'], dtype=float)  # null -> nan
+                    times, values = values[:, 0], values[:, 1]
+                    if item['kind'] == 'counter':
+                        times, values = self._counter_rate(times, values, last_points, key)
+                    if key not in accumulators:
+                        accumulators[key] = MinMaxAccumulator(start_ms, end_ms, points)
+                        tag_sets[key] = tags
+                    accumulators[key].add(times, values)
+            for key, accumulator in accumulators.items():
+                times, values = accumulator.result(points)
+                self._add_series(series, item, tag_sets[key], multi, times, values * item['scale'])
+        return series
+
+    def get_container_summary(self, namespace: str, metrics: List[Dict], start_time: Optional[str], end_time: Optional[str],
+                              interval_s: int = 30) -> Optional[Dict[str, Dict[str, Dict[str, float]]]]:
+        """Max / p95 / mean of each summary metric (see utils.panel_metrics.summary_metrics) per container.
+
+        All metrics go in one request of one aggregating statement each: counters become per-second rates
+        over interval_s buckets, sum_by series are added up per bucket, the outer SELECT aggregates the
+        whole window. Returns {container: {metric key: {'max', 'p95', 'mean'}}}, or None if the request fails.
+        """
+        if not metrics:
+            return {}
+        statements = [self._summary_statement(namespace, metric, start_time, end_time, max(1, int(interval_s))) for metric in metrics]
+        try:
+            results = self.client.query(';'.join(statements))
+        except Exception as error:
+            logger.warning(f"Summary query failed for namespace '{namespace}': {error}")
+            return None
+        if not isinstance(results, list):
+            results = [results]
+        summary: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for metric, result in zip(metrics, results):
+            for (_, tags), points in result.items():
+                instance = (tags or {}).get('instance')
+                for point in points:
+                    if not instance or point.get('max') is None:
+                        continue
+                    summary.setdefault(instance, {})[metric['key']] = {
+                        name: point[column] * metric['scale']
+                        for name, column in (('max', 'max'), ('p95', 'percentile'), ('mean', 'mean'))
+                        if point.get(column) is not None
+                    }
+        return summary
+
+    def _summary_statement(self, namespace: str, metric: Dict, start_time: Optional[str], end_time: Optional[str], interval_s: int) -> str:
+        """One statement for get_container_summary: bucketed (rate of) the field, then aggregated per instance (internal)."""
+        return (f"SELECT max(\"v\"), percentile(\"v\", 95), mean(\"v\")"
+                f" FROM ({self._bucketed_query(namespace, metric, start_time, end_time, interval_s)})"
+                f" WHERE {_window(start_time, end_time)} GROUP BY \"instance\"")
+
+    def _series_statement(self, namespace: str, item: Dict, start_time: Optional[str], end_time: Optional[str],
+                          interval_s: int, aggregate: str) -> str:
+        """One statement for get_panel_series: bucketed series, or min/max of 2 buckets for 'minmax' (internal)."""
+        if aggregate != 'minmax':
+            return self._bucketed_query(namespace, item, start_time, end_time, interval_s)
+        group_by = ', '.join([f"time({2 * interval_s}s)", '"instance"'] + [_quote_identifier(tag) for tag in item['group_by']])
+        if item['kind'] != 'counter' and not item['sum_by']:
+            # A plain gauge: min/max of the raw points
+            field = _quote_identifier(item['field'])
+            return (f"SELECT min({field}) AS \"min\", max({field}) AS \"max\" FROM {_quote_identifier(item['measurement'])}"
+                    f" WHERE {self._panel_conditions(namespace, item)}{_time_conditions(start_time, end_time)}"
+                    f" GROUP BY {group_by} fill(none)")
+        return (f"SELECT min(\"v\") AS \"min\", max(\"v\") AS \"max\""
+                f" FROM ({self._bucketed_query(namespace, item, start_time, end_time, interval_s)})"
+                f" WHERE {_window(start_time, end_time)} GROUP BY {group_by} fill(none)")
+
+    def _bucketed_query(self, namespace: str, item: Dict, start_time: Optional[str], end_time: Optional[str], interval_s: int) -> str:
+        """Mean (per-second rate for counters) of the field per interval_s bucket as "v", sum_by series
+        added up per bucket; grouped by instance and the group_by tags (internal)."""
+        conditions = f"{self._panel_conditions(namespace, item)}{_time_conditions(start_time, end_time)}"
+        field = _quote_identifier(item['field'])
+        value = f"non_negative_derivative(mean({field}), 1s)" if item['kind'] == 'counter' else f"mean({field})"
+        group_by = [f"time({interval_s}s)", '"instance"'] + [_quote_identifier(tag) for tag in item['group_by']]
+        sum_by = [_quote_identifier(tag) for tag in item['sum_by']]
+        query = (f"SELECT {value} AS \"v\" FROM {_quote_identifier(item['measurement'])} WHERE {conditions}"
+                 f" GROUP BY {', '.join(group_by + sum_by)} fill(none)")
+        if sum_by:
+            query = (f"SELECT sum(\"v\") AS \"v\" FROM ({query}) WHERE {_window(start_time, end_time)}"
+                     f" GROUP BY {', '.join(group_by)} fill(none)")
+        return query
+
+    def _add_bucketed(self, series: Dict, item: Dict, multi: bool, raws: List[Dict], bucket_s: int, aggregate: str):
+        """Adds the series of one get_panel_series statement, scaled (internal)."""
+        for raw in raws:
+            if not raw.get('values'):
+                continue
+            values = np.array(raw['values'], dtype=float)  # null -> nan
+            columns = raw['columns']
+            if aggregate == 'minmax':
+                # Envelope: the bucket minimum at its start, the maximum half a bucket later
+                times = np.concatenate([values[:, 0], values[:, 0] + bucket_s * 500])
+                points = np.concatenate([values[:, columns.index('min')], values[:, columns.index('max')]])
+                order = np.argsort(times, kind='stable')
+                times, points = times[order], points[order]
+            else:
+                times, points = values[:, 0], values[:, columns.index('v')]
+            self._add_series(series, item, raw.get('tags') or {}, multi, times, points * item['scale'])
+
+    @staticmethod
+    def _counter_rate(times: np.ndarray, values: np.ndarray, last_points: Dict[Tuple, Tuple[float, float]], key: Tuple) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-second rate between consecutive points of a counter (internal).
+
+        The last point of a chunk is carried over to the next one; negative steps (counter resets)
+        are dropped, as non_negative_derivative does.
+        """
+        if key in last_points:
+            times = np.concatenate([[last_points[key][0]], times])
+            values = np.concatenate([[last_points[key][1]], values])
+        last_points[key] = (times[-1], values[-1])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = np.diff(values) / (np.diff(times) / 1000)
+        keep = np.isfinite(rates) & (rates >= 0)
+        return times[1:][keep], rates[keep]
+
+    @staticmethod
+    def _panel_conditions(namespace: str, spec: Dict) -> str:
+        conditions = [f"\"namespace\" = '{_quote(namespace)}'"]
+        conditions += [f"{_quote_identifier(tag)} = '{_quote(value)}'" for tag, value in spec['where'].items()]
+        return ' AND '.join(conditions)
+
+    @staticmethod
+    def _add_series(series: Dict, item: Dict, tags: Dict, multi: bool, times: np.ndarray, values: np.ndarray):
+        instance = tags.get('instance')
+        if not instance:
+            return
+        parts = [tags.get(tag) or '' for tag in item['group_by']] + ([item['label'] or item['measurement']] if multi else [])
+        label = ' '.join(part for part in parts if part) or item['label'] or item['measurement']
+        series.setdefault(instance, {})[label] = (times, values)
@@ -0,0 +1,96 @@
+# service/reflex_bulk_service.py
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from service.reflex_transfer_service import ReflexTransferService
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def split_range(from_ms: int, to_ms: int, chunk_ms: int) -> List[Tuple[int, int]]:
+    """Splits [from_ms, to_ms] into consecutive sub-ranges of at most chunk_ms (utility)."""
+    from_ms, to_ms = int(from_ms), int(to_ms)
+    if chunk_ms <= 0 or to_ms - from_ms <= chunk_ms:
+        return [(from_ms, to_ms)]
+    return [(start, min(start + chunk_ms, to_ms)) for start in range(from_ms, to_ms, chunk_ms)]
+
+
+class ReflexBulkService:
+    """Runs reflex-transfer operations for many namespaces at once.
+
+    Calls fan out over a bounded pool (Reflex_bulk_max_parallel) and share the service's keep-alive
+    session, so keep Reflex_pool_size at least as large. Bulk calls never raise: every namespace gets
+    {'namespace', 'action', 'success', 'response', 'error', 'started_at', 'elapsed'} in input order,
+    started_at being seconds since the bulk call started.
+    A from/to backfill is split into Reflex_backfill_chunk_hours sub-ranges sent in parallel;
+    its result adds 'ranges' with the same fields per sub-range.
+    """
+
+    def __init__(self, reflex_service: ReflexTransferService, max_parallel: Optional[int] = None):
+        self.reflex_service = reflex_service
+        config = reflex_service.config
+        self.max_parallel = max_parallel or int(config.get_value('Reflex_bulk_max_parallel', '8'))
+        self.chunk_ms = int(float(config.get_value('Reflex_backfill_chunk_hours', '24')) * 3600 * 1000)
+
+    def create_transfers(self, namespaces: List[str], on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        return self._fan_out('create', self.reflex_service.send_create_transfer_request, [(ns,) for ns in namespaces], on_result)
+
+    def stop_transfers(self, namespaces: List[str], on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        return self._fan_out('stop', self.reflex_service.send_stop_transfer_request, [(ns,) for ns in namespaces], on_result)
+
+    def delete_instances(self, namespaces: List[str], on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        return self._fan_out('delete', self.reflex_service.send_delete_instance_request, [(ns,) for ns in namespaces], on_result)
+
+    def transfer_from_to(self, namespaces: List[str], from_ms: int, to_ms: int, chunk_ms: Optional[int] = None,
+                         on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """Backfills [from_ms, to_ms] for every namespace, each window split into parallel sub-range requests."""
+        ranges = split_range(from_ms, to_ms, self.chunk_ms if chunk_ms is None else chunk_ms)
+        calls = [(ns, start, end) for ns in namespaces for start, end in ranges]
+        results = self._fan_out('transfer_from_to', self.reflex_service.send_start_transfer_from_to_request, calls, on_result)
+        merged = []
+        for index, namespace in enumerate(namespaces):
+            parts = results[index * len(ranges):(index + 1) * len(ranges)]
+            for part, (start, end) in zip(parts, ranges):
+                part.update(from_ms=start, to_ms=end)
+            merged.append({
+                'namespace': namespace,
+                'action': 'transfer_from_to',
+                'success': all(part['success'] for part in parts),
+                'response': None,
+                'error': next((part['error'] for part in parts if part['error']), None),
+                # From the first sub-range start to the last sub-range end
+                'started_at': min(part['started_at'] for part in parts),
+                'elapsed': round(max(part['started_at'] + part['elapsed'] for part in parts) - min(part['started_at'] for part in parts), 3),
+                'ranges': parts,
+            })
+        return merged
+
+    def _fan_out(self, action: str, func: Callable[..., Any], calls: List[Tuple], on_result: Optional[Callable[[Dict], None]]) -> List[Dict]:
+        """Runs func(*args) for every args tuple on the bounded pool; results in call order (internal)."""
+        if not calls:
+            return []
+
+        batch_started = time.perf_counter()
+
+        def call(args: Tuple) -> Dict:
+            started = time.perf_counter()
+            result = {'namespace': args[0], 'action': action, 'success': False, 'response': None, 'error': None,
+                      'started_at': round(started - batch_started, 3)}
+            try:
+                result.update(success=True, response=func(*args))
+            except Exception as error:
+                logger.error(f"Reflex {action} for {args[0]} failed: {error}")
+                result['error'] = str(error)
+            result['elapsed'] = round(time.perf_counter() - started, 3)
+            if on_result:
+                on_result(result)
+            return result
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_parallel, len(calls))), thread_name_prefix='reflex-bulk') as executor:
+            results = list(executor.map(call, calls))
+        failed = sum(not result['success'] for result in results)
+        logger.info(f"Reflex {action}: {len(results) - failed}/{len(results)} calls succeeded in {time.perf_counter() - batch_started:.2f}s")
+        return results
@@ -6,8 +6,9 @@ import logging
 import urllib3
 
 from typing import Dict, Any
+from urllib3.util.retry import Retry
 from config import config
-from requests import request
+from utils.http_session import build_session
 
 # Настройка логирования
 logger = logging.getLogger(__name__)
@@ -19,38 +20,62 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 class ReflexTransferService:
     """
     Сервис для отправки данных в Reflex Transfer через REST API.
-    Все запросы — POST, URL берётся из config.reflex_transfer_url
+    URL берётся из config.reflex_transfer_url.
+
+    Все запросы идут через одну keep-alive сессию: клиентский сертификат загружается один раз,
+    mTLS-рукопожатие выполняется на соединение, а не на запрос (Reflex_pool_size, Reflex_max_retries).
     """
 
-    def __init__(self):
-        self.base_url = config.get_value('reflex_transfer_url').strip().rstrip('/reflex-stubs/api/v1')
+    def __init__(self, config_manager=None):
+        self.config = config_manager or config
 
         # Общие заголовки (можно расширить)
         self.headers = {
             "Content-Type": "application/json",
             "Accept": "application/json"
         }
-
-    def _post(self, endpoint: str, json_data: Dict[str, Any] = None, timeout: int = 30) -> dict[str, str] | None | Any:
-        """
-        Внутренний метод для отправки POST-запроса
+        self.timeout = float(self.config.get_value('Reflex_timeout', '30'))
+        max_retries = int(self.config.get_value('Reflex_max_retries', '2'))
+        # Соединение повторяется всегда (запрос ещё не отправлен), ответ 502/503/504 — только для идемпотентных методов
+        retries = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            status=max_retries,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(self.config.get_value('Reflex_retry_methods', 'GET').upper().split(',')),
+            backoff_factor=float(self.config.get_value('Reflex_backoff_factor', '0.5')),
+            raise_on_status=False,
+        )
+        self.session = build_session(
+            int(self.config.get_value('Reflex_pool_size', '10')),
+            headers=self.headers,
+            retries=retries,
+            cert=(self.config.get_value('Reflex_cert_file', './resources/certs/tls.crt'),
+                  self.config.get_value('Reflex_key_file', './resources/certs/tls.key')),
+            verify=False,
+        )
+
+    @property
+    def base_url(self) -> str:
+        # Читается при каждом запросе: URL может поменяться в настройках, сессия при этом остаётся
+        return self.config.get_value('reflex_transfer_url').strip().rstrip('/reflex-stubs/api/v1')
+
+    def _request(self, method: str, endpoint: str, json_data: Dict[str, Any] = None, timeout: float = None) -> dict[str, str] | None | Any:
+        """
+        Внутренний метод для отправки запроса через общую сессию
         """
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        logger.info(f"Отправка POST запроса: {url}")
-        logger.info(f"Payload: {json_data}")
+        logger.info(f"Отправка {method} запроса: {url}")
+        if json_data is not None:
+            logger.debug(f"Payload: {json_data}")
 
         try:
-            data = json.dumps(json_data)
-
-            response = request(
-                method="POST",
+            response = self.session.request(
+                method=method,
                 url=url,
-                data=data,
-                headers=self.headers,
-                timeout=timeout,
-                verify=False,
-                cert=('./resources/certs/tls.crt',
-                      './resources/certs/tls.key')
+                data=json.dumps(json_data) if json_data is not None else None,
+                timeout=timeout or self.timeout,
             )
 
             if response.status_code in (200, 201):
@@ -73,44 +98,15 @@ class ReflexTransferService:
             logger.error(f"Неизвестная ошибка запроса: {e}")
             raise
 
+    def _post(self, endpoint: str, json_data: Dict[str, Any] = None, timeout: float = None) -> dict[str, str] | None | Any:
+        return self._request("POST", endpoint, json_data, timeout)
 
-    def _get(self, endpoint: str, timeout: int = 30) -> dict[str, str] | None | Any:
-        """
-        Внутренний метод для отправки GET-запроса
-        """
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        logger.info(f"Отправка GET запроса: {url}")
-
-        try:
-            response = request(
-                method="GET",
-                url=url,
-                headers=self.headers,
-                timeout=timeout,
-                verify=False,
-                cert=('./resources/certs/tls.crt',
-                      './resources/certs/tls.key')
-            )
-
-            if response.status_code in (200, 201):
-                logger.info(f"Успешный ответ ({response.status_code}) от {endpoint}")
-                try:
-                    return response.json()
-                except ValueError:
-                    return {"status": "success", "raw_response": response.text}
-            else:
-                logger.error(f"Ошибка {response.status_code} от {endpoint}: {response.text}")
-                response.raise_for_status()
+    def _get(self, endpoint: str, timeout: float = None) -> dict[str, str] | None | Any:
+        return self._request("GET", endpoint, timeout=timeout)
 
-        except requests.exceptions.Timeout:
-            logger.error(f"Таймаут запроса к {endpoint}")
-            raise
-        except requests.exceptions.ConnectionError:
-            logger.error(f"Ошибка подключения к {url}")
-            raise
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Неизвестная ошибка запроса: {e}")
-            raise
+    def close(self):
+        """Закрывает соединения сессии."""
+        self.session.close()
 
     def send_create_transfer_request(self, namespace: str) -> Dict[str, Any]:
         """
@@ -0,0 +1,41 @@
+# tests/test_async_render_budget.py
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from headless_config import HeadlessConfig
+from service.grafana_services.grafana_async_screenshot_service import AsyncGrafanaScreenshotService
+
+
+def test_concurrent_async_runs_share_the_render_budget():
+    config = HeadlessConfig(environ={})
+    config.set_value('Grafana_async_concurrency', '4')
+    service = AsyncGrafanaScreenshotService(config)
+    lock = threading.Lock()
+    in_flight = peak = 0
+
+    async def fetch(session, url, tracer=None):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        return b'png'
+
+    service.fetch_panel_screenshot_async = fetch
+    service._create_screenshot_tasks = lambda containers, start_time, end_time, namespace, has_data=None: [
+        {'container': container, 'graphic_name': f'panel-{panel_id}', 'panel_id': panel_id,
+         'namespace': namespace, 'start_time': start_time, 'end_time': end_time}
+        for container in containers for panel_id in range(20)]
+    service.store_screenshot = lambda task, content: f"{task['container']}-{task['graphic_name']}.png"
+    service.screenshot_store.ensure_dir = lambda namespace: None
+
+    # Three namespaces of a batch, each on its own event loop
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = list(executor.map(lambda container: service.make_screenshots([container], 'now-1h', 'now', 'ns'), ['a', 'b', 'c']))
+
+    assert [len(result[container]) for result, container in zip(results, 'abc')] == [20, 20, 20]
+    assert peak <= 4
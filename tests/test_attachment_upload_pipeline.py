@@ -0,0 +1,50 @@
+# tests/test_attachment_upload_pipeline.py
+
+import threading
+
+from service.confluence_services.attachment_upload_pipeline import AttachmentUploadPipeline
+from service.confluence_services.confluence_attachment_service import FAILED, UPLOADED
+
+
+class _Image(str):
+    """File path with release(), like an in-memory RenderedImage."""
+    released = 0
+
+    def release(self):
+        type(self).released += 1
+
+
+class _FlakyAttachments:
+    def get_existing_attachments(self, page_id):
+        return {}
+
+    def upload_file(self, filepath, page_id, existing, tracer):
+        if 'bad' in filepath:
+            raise ConnectionError('connection reset')
+        return UPLOADED
+
+
+def test_failed_upload_does_not_stall_the_queue():
+    files = [_Image(f"{'bad' if i % 2 else 'ok'}-{i}.png") for i in range(10)]
+    callbacks = []
+
+    def on_uploaded(filepath, status):
+        callbacks.append(filepath)
+        if filepath == files[0]:
+            raise RuntimeError('callback failed')
+
+    def run():
+        # One worker and a queue of one: a dead worker would block submit() forever
+        pipeline = AttachmentUploadPipeline(_FlakyAttachments(), 'page', workers=1, queue_size=1, on_uploaded=on_uploaded)
+        for filepath in files:
+            pipeline.submit(filepath)
+        results.update(pipeline.close())
+
+    results = {}
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    assert results == {filepath: FAILED if 'bad' in filepath else UPLOADED for filepath in files}
+    assert _Image.released == len(files)
+    assert sorted(callbacks) == sorted(files)
@@ -0,0 +1,78 @@
+# tests/test_backoff_controller.py
+
+from datetime import datetime, timezone
+
+import pytest
+
+from service.grafana_services.backoff_controller import (CLOSED, HALF_OPEN, OPEN, BackoffController,
+                                                         CircuitOpenError, parse_retry_after)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def open_circuit(clock, threshold=3):
+    backoff = BackoffController(failure_threshold=threshold, reset_timeout=30, rng=lambda: 0.0, clock=clock)
+    for _ in range(threshold):
+        assert backoff.before_request() == 0.0
+        backoff.on_failure()
+    assert backoff.state == OPEN
+    return backoff
+
+
+def test_circuit_opens_after_threshold_and_closes_after_successful_probe():
+    clock = FakeClock()
+    backoff = open_circuit(clock)
+    with pytest.raises(CircuitOpenError):
+        backoff.before_request()
+    clock.now += 29.9
+    with pytest.raises(CircuitOpenError):
+        backoff.before_request()
+    clock.now += 0.1
+    assert backoff.before_request() == 0.0
+    assert backoff.state == HALF_OPEN
+    backoff.on_success()
+    assert backoff.state == CLOSED and backoff.failures == 0
+    assert backoff.before_request() == 0.0
+
+
+def test_half_open_lets_a_single_probe_through():
+    clock = FakeClock()
+    backoff = open_circuit(clock)
+    clock.now += 30
+    backoff.before_request()
+    with pytest.raises(CircuitOpenError, match='probe'):
+        backoff.before_request()
+    assert backoff.state == HALF_OPEN
+
+
+def test_failed_probe_reopens_the_circuit():
+    clock = FakeClock()
+    backoff = open_circuit(clock)
+    clock.now += 30
+    backoff.before_request()
+    backoff.on_failure()
+    assert backoff.state == OPEN
+    # The reset timeout starts over from the failed probe
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        backoff.before_request()
+    clock.now += 1
+    backoff.before_request()
+    assert backoff.state == HALF_OPEN
+
+
+def test_parse_retry_after_seconds_and_http_date():
+    now = datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    assert parse_retry_after('120', now) == 120.0
+    assert parse_retry_after(' 1.5 ', now) == 1.5
+    assert parse_retry_after('-5', now) == 0.0
+    assert parse_retry_after('Mon, 01 Jan 2024 12:00:30 GMT', now) == 30.0
+    assert parse_retry_after('Mon, 01 Jan 2024 11:59:00 GMT', now) == 0.0
+    assert parse_retry_after('soon', now) is None
+    assert parse_retry_after(None) is None
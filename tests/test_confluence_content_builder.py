@@ -0,0 +1,129 @@
+# tests/test_confluence_content_builder.py
+
+from bs4 import BeautifulSoup
+
+from utils.confluence_content_builder import content_hash, create_report_section, extract_first_table, replace_report_section
+
+PAGE = '<h1>Report</h1><p>manual notes</p>'
+
+
+def _stored(body: str) -> str:
+    """Body as Confluence returns it: macros get an ac:macro-id attribute."""
+    return body.replace('ac:schema-version="1">', 'ac:schema-version="1" ac:macro-id="0a1b2c">')
+
+
+def test_missing_section_is_appended():
+    body = replace_report_section(PAGE, 'run1', '<p>v1</p>')
+    assert body == PAGE + create_report_section('run1', '<p>v1</p>')
+
+
+def test_unchanged_section_is_skipped():
+    body = _stored(PAGE + create_report_section('run1', '<p>v1</p>'))
+    assert replace_report_section(body, 'run1', '<p>v1</p>') is None
+
+
+def test_changed_section_is_replaced_in_place():
+    before = '<p>before</p>'
+    after = '<p>after</p>'
+    body = _stored(before + create_report_section('run1', '<p>v1</p>') + after)
+    updated = replace_report_section(body, 'run1', '<p>v2</p>')
+    assert updated == before + create_report_section('run1', '<p>v2</p>') + after
+    assert '<p>v1</p>' not in updated
+
+
+def test_other_sections_are_untouched():
+    first = create_report_section('run1', '<p>one</p>')
+    second = create_report_section('run2', '<p>two</p>')
+    updated = replace_report_section(first + second, 'run2', '<p>three</p>')
+    assert updated == first + create_report_section('run2', '<p>three</p>')
+    # A key that is a prefix of another key does not match it
+    assert replace_report_section(create_report_section('run10', '<p>x</p>'), 'run1', '<p>x</p>').count('run10') == 2
+
+
+def test_section_begin_anchor_carries_content_hash():
+    section = create_report_section('run1', '<p>v1</p>')
+    assert f"lttools-report-run1-{content_hash('<p>v1</p>')}" in section
+    assert section.endswith('lttools-report-run1-end</ac:parameter></ac:structured-macro>')
+
+
+# Config pages in storage format, as returned by expand=body.storage
+CONFIG_PAGE = (
+    '<p>intro</p><table data-layout="wide" class="confluenceTable"><colgroup><col style="width: 200px;"/><col/></colgroup>'
+    '<tbody><tr><th class="confluenceTh"><p>Pod</p></th><th><p>Version</p></th></tr>'
+    '<tr><td class="confluenceTd" rowspan="1"><p>app-NS1-pod</p></td><td colspan="1" style="text-align: left;"><p>1.2.3</p></td></tr>'
+    '<tr><th><p>group</p></th></tr>'
+    '<tr><td><p>other-ns2</p></td><td><p>2.0</p></td></tr></tbody></table>'
+    '<table><tbody><tr><td>second table</td></tr></tbody></table>'
+)
+ENTITIES_PAGE = (
+    '<table><tbody><tr><th>Pod</th><th>Opts</th></tr>'
+    '<tr><td><p>ns1 &amp; co&nbsp;&lt;x&gt; &#x44F;</p></td><td><p>-Xmx1g&nbsp;-Dfoo=&quot;bar&quot;</p></td></tr></tbody></table>'
+)
+MACROS_PAGE = (
+    '<table><tbody><tr><th>Pod</th><th>Status</th><th>Opts</th></tr>'
+    '<tr><td><p><ac:structured-macro ac:name="status" ac:schema-version="1" ac:macro-id="abc">'
+    '<ac:parameter ac:name="title">NS1</ac:parameter></ac:structured-macro> pod<!-- <td>note</td> --></p></td>'
+    '<td><ac:structured-macro ac:name="status" ac:schema-version="1"><ac:parameter ac:name="title">OK</ac:parameter></ac:structured-macro></td>'
+    '<td><ac:structured-macro ac:name="code" ac:schema-version="1"><ac:plain-text-body><![CDATA[-Xmx1g </td><td> -Xms1g]]>'
+    '</ac:plain-text-body></ac:structured-macro><br/></td></tr>'
+    '<tr><td><ac:structured-macro ac:name="code" ac:schema-version="1"><ac:plain-text-body><![CDATA[ns2-<pod>]]>'
+    '</ac:plain-text-body></ac:structured-macro></td><td/><td>x</td></tr></tbody></table>'
+)
+NESTED_PAGE = (
+    '<table><tbody><tr><th>Pod</th><th>Resources</th></tr>'
+    '<tr><td><p>ns1-pod</p></td><td><table><tbody><tr><td>cpu</td><td>2</td></tr></tbody></table></td></tr>'
+    '<tr><td>ns1-pod-2</td><td>x</td></tr></tbody></table>'
+)
+NO_TABLE_PAGE = '<p>No config yet</p><ac:structured-macro ac:name="info" ac:schema-version="1"><ac:rich-text-body><p>todo</p></ac:rich-text-body></ac:structured-macro>'
+
+
+def _soup_rows(html_content):
+    """The BeautifulSoup extraction extract_first_table replaced (first cell text, other cells)."""
+    tables = BeautifulSoup(html_content, 'html.parser').find_all('table')
+    if not tables:
+        return None
+    rows = []
+    for row in tables[0].find_all('tr')[1:]:
+        tds = row.find_all('td')
+        if tds:
+            rows.append((tds[0].text.upper(), [str(td) for td in tds[1:]]))
+    return rows
+
+
+def _as_soup(rows):
+    """Cells serialized the way BeautifulSoup does, so raw storage XML compares with the old Tag output."""
+    return [(first_cell_text, [str(BeautifulSoup(cell, 'html.parser')) for cell in cells]) for first_cell_text, cells in rows]
+
+
+def test_extract_first_table_matches_beautifulsoup():
+    for page in (CONFIG_PAGE, ENTITIES_PAGE, MACROS_PAGE):
+        assert _as_soup(extract_first_table(page)) == _soup_rows(page)
+
+
+def test_extract_first_table_keeps_cells_as_stored():
+    rows = extract_first_table(CONFIG_PAGE)
+    assert rows == [
+        ('APP-NS1-POD', ['<td colspan="1" style="text-align: left;"><p>1.2.3</p></td>']),
+        ('OTHER-NS2', ['<td><p>2.0</p></td>']),
+    ]
+    first_cell_text, cells = extract_first_table(ENTITIES_PAGE)[0]
+    assert first_cell_text == 'NS1 & CO\xa0<X> \u042f'
+    assert cells == ['<td><p>-Xmx1g&nbsp;-Dfoo=&quot;bar&quot;</p></td>']
+    # Markup inside CDATA and comments is text, not cells
+    rows = extract_first_table(MACROS_PAGE)
+    assert [(first_cell_text, len(cells)) for first_cell_text, cells in rows] == [('NS1 POD', 2), ('NS2-<POD>', 2)]
+    assert '<![CDATA[-Xmx1g </td><td> -Xms1g]]>' in rows[0][1][1]
+
+
+def test_nested_table_stays_in_its_cell():
+    assert extract_first_table(NESTED_PAGE) == [
+        ('NS1-POD', ['<td><table><tbody><tr><td>cpu</td><td>2</td></tr></tbody></table></td>']),
+        ('NS1-POD-2', ['<td>x</td>']),
+    ]
+    # BeautifulSoup searched recursively: the nested cells were appended to the row and the nested row became a row
+    assert [first_cell_text for first_cell_text, cells in _soup_rows(NESTED_PAGE)] == ['NS1-POD', 'CPU', 'NS1-POD-2']
+
+
+def test_page_without_table():
+    assert extract_first_table(NO_TABLE_PAGE) is None
+    assert _soup_rows(NO_TABLE_PAGE) is None
@@ -0,0 +1,38 @@
+# tests/test_confluence_graphics_sorter.py
+
+import random
+
+from utils.confluence_graphics_sorter import ALL_METRICS_ORDER, categorize_graphics, classify_panel, sort_graphics_by_order
+
+# Panel names of the baseline dashboard plus names the order does not know
+BASELINE_PANELS = list(ALL_METRICS_ORDER)
+UNKNOWN_PANELS = ['jvm-classes-loaded', 'Custom-panel', 'active-sessions']
+EXPECTED_ORDER = BASELINE_PANELS + ['active-sessions', 'Custom-panel', 'jvm-classes-loaded']
+
+
+def test_baseline_panels_sort_in_metrics_order():
+    names = BASELINE_PANELS + UNKNOWN_PANELS
+    for seed in range(5):
+        random.Random(seed).shuffle(names)
+        graphics = {name: f'{name}.png' for name in names}
+        assert [name for name, path in sort_graphics_by_order(graphics)] == EXPECTED_ORDER
+
+
+def test_nonheap_per_pool_ranks_by_its_own_slug():
+    # Used to match only as a substring of heap-per-pool-(bytes) and share its rank 10
+    assert classify_panel('nonHeap-per-pool-(bytes)') == (11, True)
+    assert classify_panel('heap-per-pool-(bytes)') == (10, True)
+    graphics = {'nonHeap-per-pool-(bytes)': 'a.png', 'heap-per-pool-(bytes)': 'b.png'}
+    assert [name for name, path in sort_graphics_by_order(graphics)] == ['heap-per-pool-(bytes)', 'nonHeap-per-pool-(bytes)']
+
+
+def test_names_containing_a_slug_take_its_rank():
+    assert classify_panel('pod-cpu-usage-percent-avg')[0] == ALL_METRICS_ORDER.index('cpu-usage-percent')
+    assert classify_panel('active-sessions') == (len(ALL_METRICS_ORDER), False)
+
+
+def test_categorize_splits_software_panels():
+    system, software = categorize_graphics({'pod': {name: f'{name}.png' for name in BASELINE_PANELS}})
+    assert list(software['pod']) == ['heap-(bytes)', 'heap-per-pool-(bytes)', 'nonHeap-per-pool-(bytes)',
+                                     'metaspace-(bytes)', 'gc-collection-count-time', 'threads-count']
+    assert list(system['pod']) == BASELINE_PANELS[:9]
@@ -0,0 +1,76 @@
+# tests/test_downsampling.py
+
+import numpy as np
+
+from utils.downsampling import MinMaxAccumulator, lttb, minmax
+
+
+def _series(n: int = 10000, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    x = np.arange(n, dtype=float) * 5000
+    y = np.sin(x / 600000) * 40 + rng.normal(0, 5, n)
+    return x, y
+
+
+def test_minmax_keeps_global_extremes():
+    x, y = _series()
+    y[1234], y[8765] = 1000.0, -1000.0  # spikes
+    kept_x, kept_y = minmax(x, y, 100)
+    assert len(kept_x) <= 200
+    assert kept_y.max() == y.max() and kept_y.min() == y.min()
+    assert set(kept_x) >= {x[1234], x[8765]}
+    assert np.all(np.diff(kept_x) > 0)
+
+
+def test_minmax_unsorted_input_matches_sorted():
+    x, y = _series(2000)
+    order = np.random.default_rng(2).permutation(len(x))
+    sorted_x, sorted_y = minmax(x, y, 50)
+    shuffled_x, shuffled_y = minmax(x[order], y[order], 50)
+    np.testing.assert_array_equal(sorted_x, shuffled_x)
+    np.testing.assert_array_equal(sorted_y, shuffled_y)
+
+
+def test_minmax_short_series_is_returned_whole():
+    x, y = _series(50)
+    kept_x, kept_y = minmax(x, y, 100)
+    np.testing.assert_array_equal(kept_x, x)
+    np.testing.assert_array_equal(kept_y, y)
+
+
+def test_lttb_returns_threshold_points_with_endpoints():
+    x, y = _series()
+    for threshold in (3, 10, 1200, 9999):
+        kept_x, kept_y = lttb(x, y, threshold)
+        assert len(kept_x) == threshold
+        assert kept_x[0] == x[0] and kept_x[-1] == x[-1]
+        assert kept_y[0] == y[0] and kept_y[-1] == y[-1]
+        assert np.all(np.diff(kept_x) > 0)
+
+
+def test_lttb_skips_nan_points():
+    x, y = _series(1000)
+    y[::7] = np.nan
+    kept_x, kept_y = lttb(x, y, 100)
+    assert len(kept_x) == 100
+    assert np.all(np.isfinite(kept_y))
+
+
+def test_accumulator_over_chunks_matches_single_minmax():
+    x, y = _series()
+    accumulator = MinMaxAccumulator(x[0], x[-1], 100)
+    for start in range(0, len(x), 777):
+        accumulator.add(x[start:start + 777], y[start:start + 777])
+    chunked_x, chunked_y = accumulator.result()
+    whole_x, whole_y = minmax(x, y, 100, x_range=(x[0], x[-1]))
+    assert accumulator.points == len(x)
+    np.testing.assert_array_equal(chunked_x, whole_x)
+    np.testing.assert_array_equal(chunked_y, whole_y)
+
+
+def test_accumulator_result_with_threshold_uses_lttb():
+    x, y = _series()
+    accumulator = MinMaxAccumulator(x[0], x[-1], 500)
+    accumulator.add(x, y)
+    kept_x, _ = accumulator.result(300)
+    assert len(kept_x) == 300
@@ -0,0 +1,26 @@
+# tests/test_headless_config.py
+
+import json
+
+from headless_config import HeadlessConfig
+from utils.panel_metrics import panel_measurements
+
+RULES = [{'containers': ['*ingress*'], 'exclude': ['heap-(bytes)', 'threads-count']}]
+
+
+def test_nested_json_config_round_trips(tmp_path):
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps({
+        'Grafana_host': 'http://grafana',
+        'Grafana_max_workers': 20,
+        'Report_summary': False,
+        'Grafana_panel_rules': RULES,
+        'Influxdb_panel_measurements': {'jvm-threads': 'jvm_threads_live_threads'},
+    }), encoding='utf-8')
+    config = HeadlessConfig(str(path), environ={})
+
+    assert config.get_value('Grafana_host') == 'http://grafana'
+    assert config.get_value('Grafana_max_workers') == '20'
+    assert config.get_value('Report_summary') == 'false'
+    assert json.loads(config.get_value('Grafana_panel_rules')) == RULES
+    assert panel_measurements(config) == {'jvm-threads': 'jvm_threads_live_threads'}
@@ -0,0 +1,23 @@
+# tests/test_panel_catalog.py
+
+from service.grafana_services.panel_catalog import panels_from_dashboard
+
+DASHBOARD = {
+    'panels': [
+        {'id': 1, 'type': 'text', 'title': 'Read me'},
+        {'id': 2, 'type': 'stat', 'title': 'Pods'},
+        {'id': 5, 'type': 'timeseries', 'title': 'CPU usage percent'},
+        {'id': 6, 'type': 'graph', 'title': 'CPU usage limit (millicores)'},
+        {'id': 7, 'type': 'timeseries', 'title': ''},
+        {'id': 100, 'type': 'row', 'title': 'JVM', 'collapsed': True, 'panels': [
+            {'id': 54, 'type': 'timeseries', 'title': 'Threads count'},
+            {'id': 55, 'type': 'table', 'title': 'Top threads'},
+        ]},
+    ],
+}
+
+
+def test_only_titled_graph_panels_are_cataloged():
+    assert panels_from_dashboard(DASHBOARD) == {
+        'cpu-usage-percent': 5, 'cpu-usage-limit-(millicores)': 6, 'threads-count': 54,
+    }
@@ -0,0 +1,30 @@
+# tests/test_panel_metrics.py
+
+import numpy as np
+
+from service.influx_query_service import InfluxQueryService
+from utils.panel_metrics import PANEL_MEASUREMENTS, panel_spec
+
+
+def test_plain_measurement_is_one_native_gauge():
+    spec = panel_spec('jvm_threads_live_threads')
+    assert spec['native'] and spec['kind'] == 'gauge' and spec['scale'] == 1.0
+    assert [item['measurement'] for item in spec['series']] == ['jvm_threads_live_threads']
+
+
+def test_in_out_panels_carry_both_counters():
+    spec = panel_spec(PANEL_MEASUREMENTS['traffic-in-out-(bytes)'])
+    assert spec['measurement'] == 'container_network_receive_bytes_total'
+    assert [(item['label'], item['kind']) for item in spec['series']] == [('in', 'counter'), ('out', 'counter')]
+    assert not panel_spec(PANEL_MEASUREMENTS['cpu-usage-percent'])['native']
+
+
+def test_counter_rate_carries_last_point_and_drops_resets():
+    last_points = {}
+    times, rates = InfluxQueryService._counter_rate(np.array([0., 1000., 2000.]), np.array([0., 5., 10.]), last_points, 'k')
+    np.testing.assert_array_equal(times, [1000., 2000.])
+    np.testing.assert_array_equal(rates, [5., 5.])
+    # Next chunk: the first rate is taken from the last point of the previous one; the reset is dropped
+    times, rates = InfluxQueryService._counter_rate(np.array([4000., 5000.]), np.array([20., 1.]), last_points, 'k')
+    np.testing.assert_array_equal(times, [4000.])
+    np.testing.assert_array_equal(rates, [5.])
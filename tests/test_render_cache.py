@@ -0,0 +1,19 @@
+# tests/test_render_cache.py
+
+from service.grafana_services.render_cache import is_cacheable
+
+URL = 'http://grafana:3000/render/d-solo/uid/dash?panelId=2&var-namespace=ns&from={}&to={}&refresh=5s'
+NOW_MS = 1_700_000_000_000
+
+
+def test_finished_absolute_window_is_cacheable():
+    assert is_cacheable(URL.format(NOW_MS - 3_600_000, NOW_MS - 60_000), NOW_MS)
+
+
+def test_relative_window_is_bypassed():
+    assert not is_cacheable(URL.format('now-1h', 'now'), NOW_MS)
+    assert not is_cacheable(URL.format(NOW_MS - 3_600_000, 'now'), NOW_MS)
+
+
+def test_absolute_window_ending_in_the_future_is_bypassed():
+    assert not is_cacheable(URL.format(NOW_MS - 3_600_000, NOW_MS + 60_000), NOW_MS)
@@ -1,7 +1,13 @@
 # utils/confluence_content_builder.py
 
-from bs4 import BeautifulSoup
-from typing import List, Dict, Tuple, Any
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+from html import escape, unescape
+from typing import Any, Dict, List, Optional, TextIO, Tuple
 from pathlib import Path
 
 def load_template(template_path: str) -> str:
@@ -12,70 +18,225 @@ def load_template(template_path: str) -> str:
     with open(path, "r", encoding="utf-8") as file:
         return file.read()
 
-def get_table_from_page(confluence, page_id: str, namespace: str) -> list[Any] | None:
-    """Extracts table rows from a Confluence page (utility)."""
-    page = confluence.get_page_by_id(page_id, expand='body.storage')
-    html_content = page['body']['storage']['value']
-    soup = BeautifulSoup(html_content, 'html.parser')
-    tables = soup.find_all('table')
-    if not tables:
-        print("No tables found on page")
-        return None
-    table = tables[0]
+# Config page tables by (Confluence url, page id): {'version', 'rows', 'index'}; reused while the page version is unchanged
+_table_cache: Dict[Tuple[str, str], Dict] = {}
+_table_cache_lock = threading.Lock()
+# CDATA sections (code macros) and comments are matched first so markup inside them is not taken for cells
+_TABLE_TAG = re.compile(r'<!\[CDATA\[.*?\]\]>|<!--.*?-->|<(/?)(table|tr|td)\b[^>]*?(/?)>', re.IGNORECASE | re.DOTALL)
+_CELL_MARKUP = re.compile(r'<!\[CDATA\[(.*?)\]\]>|<!--.*?-->|<[^>]+>', re.DOTALL)
+
+def extract_first_table(html_content: str) -> Optional[List[Tuple[str, List[str]]]]:
+    """Rows of the first table as (upper-cased text of the first cell, XML of the other cells) (utility).
+
+    Scans tags up to the end of the first table instead of parsing the page; the header row is skipped
+    and cells are returned as stored. None if the page has no table.
+    """
     rows = []
-    for row in table.find_all('tr')[1:]:
-        tds = row.find_all('td')
-        if not tds:
+    found = False
+    depth = 0
+    row_cells = None
+    cell_start = None
+    for match in _TABLE_TAG.finditer(html_content):
+        closing, tag, self_closing = match.group(1), match.group(2), match.group(3)
+        if tag is None:
             continue
-        first_cell_text = tds[0].text.upper()
-        if namespace.upper() not in first_cell_text:
+        tag = tag.lower()
+        if self_closing:
+            if tag == 'td' and depth == 1 and row_cells is not None:
+                row_cells.append(match.group(0))  # <td/> is an empty cell, not a missing one
             continue
-        cells = [cell for cell in tds[1:]]
-        rows.append(cells)
-    return rows
+        if tag == 'table':
+            found = True
+            depth += -1 if closing else 1
+            if depth == 0:
+                break
+        elif depth != 1:
+            continue  # tables nested in cells stay part of the cell
+        elif tag == 'tr':
+            if not closing:
+                row_cells = []
+            elif row_cells is not None:
+                rows.append(row_cells)
+                row_cells = None
+        elif row_cells is not None:
+            if not closing:
+                cell_start = match.start()
+            elif cell_start is not None:
+                row_cells.append(html_content[cell_start:match.end()])
+                cell_start = None
+    if not found:
+        return None
+    return [(unescape(_CELL_MARKUP.sub(lambda m: m.group(1) or '', cells[0])).upper(), cells[1:]) for cells in rows[1:] if cells]
+
+def get_table_from_page(confluence, page_id: str, namespace: str, cache_dir: Optional[str] = None) -> list[Any] | None:
+    """Extracts table rows from a Confluence page (utility).
+
+    The rows are cached per page version (in memory and in cache_dir), so an unchanged page costs
+    one small version request instead of downloading and parsing the body.
+    """
+    key = (getattr(confluence, 'url', ''), str(page_id))
+    cache_path = None
+    if cache_dir:
+        cache_path = os.path.join(cache_dir, f"confluence_table_v2_{hashlib.sha256('|'.join(key).encode('utf-8')).hexdigest()[:16]}.json")
+    with _table_cache_lock:
+        entry = _table_cache.get(key)
+    if entry is None and cache_path:
+        entry = _load_table_cache(cache_path)
+    if entry is not None and confluence.get_page_by_id(page_id, expand='version')['version']['number'] != entry['version']:
+        entry = None
+    if entry is None:
+        page = confluence.get_page_by_id(page_id, expand='body.storage,version')
+        entry = {'version': page['version']['number'], 'rows': extract_first_table(page['body']['storage']['value']), 'index': {}}
+        if cache_path:
+            _save_table_cache(cache_path, entry)
+    if entry['rows'] is None:
+        print("No tables found on page")
+        return None
+    with _table_cache_lock:
+        _table_cache[key] = entry
+        rows = entry['index'].get(namespace.upper())
+        if rows is None:
+            rows = entry['index'][namespace.upper()] = [cells for first_cell_text, cells in entry['rows'] if namespace.upper() in first_cell_text]
+    return list(rows)
+
+def _load_table_cache(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            cached = json.load(file)
+        rows = cached['rows']
+        return {'version': cached['version'], 'rows': [(first, cells) for first, cells in rows] if rows is not None else None, 'index': {}}
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+def _save_table_cache(path: str, entry: Dict):
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({'version': entry['version'], 'rows': entry['rows']}, file, ensure_ascii=False)
+    except OSError:
+        pass
+
+# Builders write fragments into one text buffer (io.StringIO or anything with write()), so a page is
+# assembled once instead of through nested joins; create_* return the same markup as a string.
+UI_EXPAND_OPEN = '<ac:structured-macro ac:name="ui-expand" ac:schema-version="1"><ac:parameter ac:name="title">{}</ac:parameter><ac:rich-text-body><p>'
+UI_EXPAND_CLOSE = '</p></ac:rich-text-body></ac:structured-macro>'
+
+def _render(write, *args) -> str:
+    out = io.StringIO()
+    write(out, *args)
+    return out.getvalue()
+
+def write_xml_table(out: TextIO, rows: List):
+    """Writes the config XML table; cells are storage XML as extracted from the config page (utility)."""
+    out.write("<table><colgroup> <col/> <col/> <col/> <col/> <col/> <col/> </colgroup><tbody><tr>")
+    for header in ['Pod', 'Distribution version', 'Install date', 'Status', 'Resources', 'Java Opts']:
+        out.write(f"<th><p>{header}</p></th>")
+    out.write("</tr>")
+    for row in rows:
+        out.write("<tr>")
+        for cell in row:
+            out.write(str(cell))
+        out.write("</tr>")
+    out.write('</tbody></table>')
 
 def create_xml_table(rows: List) -> str:
     """Builds XML table string (utility)."""
-    res = "<table><colgroup> <col/> <col/> <col/> <col/> <col/> <col/> </colgroup><tbody>"
-    headers = ['Pod', 'Distribution version', 'Install date', 'Status', 'Resources', 'Java Opts']
-    res += "<tr>" + "".join(f"<th><p>{header}</p></th>" for header in headers) + "</tr>"
-    for row in rows:
-        res += "<tr>" + "".join(str(v) for v in row) + "</tr>"
-    res += '</tbody></table>'
-    return res
+    return _render(write_xml_table, rows)
+
+def format_summary_value(value: float, unit: str = '') -> str:
+    """Compact number for the summary table: binary prefixes for bytes (utility)."""
+    if unit == 'bytes':
+        for prefix in ('B', 'KiB', 'MiB', 'GiB'):
+            if abs(value) < 1024:
+                return f"{value:.0f} {prefix}" if prefix == 'B' else f"{value:.1f} {prefix}"
+            value /= 1024
+        return f"{value:.1f} TiB"
+    return f"{value:.0f}" if abs(value) >= 100 else f"{value:.2g}" if abs(value) < 1 else f"{value:.1f}"
+
+def write_summary_table(out: TextIO, summary: Dict[str, Dict[str, Dict[str, float]]], metrics: List[Dict]):
+    """Writes the per-container summary XML table, one "max / p95 / mean" cell per metric (utility)."""
+    out.write("<table><colgroup>" + " <col/>" * (len(metrics) + 1) + " </colgroup><tbody><tr><th><p>Container</p></th>")
+    for metric in metrics:
+        out.write(f"<th><p>{escape(metric['title'])}<br/>max / p95 / mean</p></th>")
+    out.write("</tr>")
+    for container in sorted(summary):
+        out.write(f"<tr><td><p>{escape(container)}</p></td>")
+        for metric in metrics:
+            values = summary[container].get(metric['key'])
+            cell = " / ".join(format_summary_value(values[name], metric['unit']) if name in values else '-'
+                              for name in ('max', 'p95', 'mean')) if values else '-'
+            out.write(f"<td><p>{cell}</p></td>")
+        out.write("</tr>")
+    out.write('</tbody></table>')
+
+def create_summary_table(summary: Dict[str, Dict[str, Dict[str, float]]], metrics: List[Dict]) -> str:
+    """Builds the per-container summary XML table (utility)."""
+    return _render(write_summary_table, summary, metrics)
+
+def write_panel_content(out: TextIO, sorted_graphics: List[Tuple[str, str]]):
+    """Writes HTML for panels (utility)."""
+    for panel_name, screenshot_path in sorted_graphics:
+        out.write(f'<h3>{escape(panel_name)}</h3><br /><ac:image ac:height="400">'
+                  f'<ri:attachment ri:filename="{escape(Path(screenshot_path).name)}" /></ac:image><br /><br />')
 
 def create_panel_content(sorted_graphics: List[Tuple[str, str]]) -> str:
     """Builds HTML for panels (utility)."""
-    panels_html = []
-    for panel_name, screenshot_path in sorted_graphics:
-        panels_html.append(f"<h3>{panel_name}</h3>")
-        filename = Path(screenshot_path).name
-        image_macro = f'<br /><ac:image ac:height="400"><ri:attachment ri:filename="{filename}" /></ac:image><br /><br />'
-        panels_html.append(image_macro)
-    return "".join(panels_html)
+    return _render(write_panel_content, sorted_graphics)
+
+def write_service_expand(out: TextIO, service_name: str, graphics: Dict[str, str], sorter):
+    """Writes UI expand for a service (utility, depends on sorter util)."""
+    out.write(UI_EXPAND_OPEN.format(escape(service_name)))
+    write_panel_content(out, sorter(graphics))
+    out.write(UI_EXPAND_CLOSE)
 
 def create_service_expand(service_name: str, graphics: Dict[str, str], sorter) -> str:
     """Builds UI expand for a service (utility, depends on sorter util)."""
-    sorted_graphics = sorter(graphics)  # Updated to pass sorter as callable if needed
-    panels_content = create_panel_content(sorted_graphics)
-    return (
-        '<ac:structured-macro ac:name="ui-expand" ac:schema-version="1">'
-        f'<ac:parameter ac:name="title">{service_name}</ac:parameter>'
-        f'<ac:rich-text-body><p>{panels_content}</p></ac:rich-text-body>'
-        '</ac:structured-macro>'
-    )
+    return _render(write_service_expand, service_name, graphics, sorter)
+
+def write_metrics_category_macro(out: TextIO, category_name: str, services_graphics: Dict[str, Dict[str, str]], sorter):
+    """Writes macro for metrics category (utility)."""
+    out.write(UI_EXPAND_OPEN.format(escape(category_name)))
+    for service_name, graphics in sorted(services_graphics.items()):
+        write_service_expand(out, service_name, graphics, sorter)
+    out.write(UI_EXPAND_CLOSE)
 
 def create_metrics_category_macro(category_name: str, services_graphics: Dict[str, Dict[str, str]], sorter) -> str:
     """Builds macro for metrics category (utility)."""
-    sorted_services = sorted(services_graphics.items())
-    service_expands_html = []
-    for service_name, graphics in sorted_services:
-        service_macro = create_service_expand(service_name, graphics, sorter)
-        service_expands_html.append(service_macro)
-    services_content = "".join(service_expands_html)
-    return (
-        '<ac:structured-macro ac:name="ui-expand" ac:schema-version="1">'
-        f'<ac:parameter ac:name="title">{category_name}</ac:parameter>'
-        f'<ac:rich-text-body><p>{services_content}</p></ac:rich-text-body>'
-        '</ac:structured-macro>'
-    )
\ No newline at end of file
+    return _render(write_metrics_category_macro, category_name, services_graphics, sorter)
+
+# Report sections are delimited by anchor macros, which Confluence keeps through edits (comments are dropped).
+# The begin anchor carries a hash of the section content, so an unchanged section is detected without a diff.
+SECTION_ANCHOR = '<ac:structured-macro ac:name="anchor" ac:schema-version="1"><ac:parameter ac:name="">{}</ac:parameter></ac:structured-macro>'
+SECTION_PREFIX = 'lttools-report'
+
+def content_hash(content: str) -> str:
+    """Short hash of generated storage XML (utility)."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:12]
+
+def section_key(*parts: str) -> str:
+    """Stable section id for one report run, e.g. from namespace, test and window (utility)."""
+    return hashlib.sha256('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()[:12]
+
+def create_report_section(key: str, content: str) -> str:
+    """Wraps content in the begin/end anchors of section `key` (utility)."""
+    return (SECTION_ANCHOR.format(f"{SECTION_PREFIX}-{key}-{content_hash(content)}")
+            + content
+            + SECTION_ANCHOR.format(f"{SECTION_PREFIX}-{key}-end"))
+
+def _section_pattern(key: str) -> re.Pattern:
+    # Tolerates attributes Confluence adds to stored macros (ac:macro-id, reordering)
+    anchor = r'<ac:structured-macro\b[^>]*>\s*<ac:parameter ac:name="">{}</ac:parameter>\s*</ac:structured-macro>'
+    label = f"{SECTION_PREFIX}-{re.escape(key)}"
+    return re.compile(anchor.format(label + r'-(?P<hash>[0-9a-f]{12})') + '.*?' + anchor.format(label + '-end'), re.DOTALL)
+
+def replace_report_section(body: str, key: str, content: str) -> Optional[str]:
+    """Page body with section `key` replaced by content, or appended if absent; None if the section is unchanged (utility)."""
+    match = _section_pattern(key).search(body)
+    if match and match.group('hash') == content_hash(content):
+        return None
+    section = create_report_section(key, content)
+    if not match:
+        return body + section
+    return body[:match.start()] + section + body[match.end():]
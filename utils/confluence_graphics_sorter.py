@@ -1,5 +1,7 @@
 # utils/confluence_graphics_sorter.py
 
+import re
+from functools import lru_cache
 from typing import List, Dict, Tuple
 
 ALL_METRICS_ORDER = [
@@ -10,31 +12,43 @@ ALL_METRICS_ORDER = [
     'metaspace-(bytes)', 'gc-collection-count-time', 'threads-count'
 ]
 
+SOFTWARE_KEYWORDS = ['heap', 'metaspace', 'gc', 'jvm', 'thread', 'class', 'compilation']
+
+_METRIC_RANKS = {metric_name.lower(): rank for rank, metric_name in enumerate(ALL_METRICS_ORDER)}
+# Lookahead alternation: every position of the name is tried, so overlapping slugs are all found in one scan
+_METRIC_PATTERN = re.compile('(?=(' + '|'.join(re.escape(name) for name in sorted(_METRIC_RANKS, key=len, reverse=True)) + '))')
+_SOFTWARE_PATTERN = re.compile('|'.join(re.escape(keyword) for keyword in SOFTWARE_KEYWORDS))
+
+@lru_cache(maxsize=8192)
+def classify_panel(panel_name: str) -> Tuple[int, bool]:
+    """(order rank, is software metric) of a panel name, computed once per name (utility).
+
+    The rank is the position of the panel's slug in ALL_METRICS_ORDER (an exact name first, else the
+    earliest slug contained in it); unknown panels get len(ALL_METRICS_ORDER).
+    """
+    name = panel_name.lower()
+    rank = _METRIC_RANKS.get(name)
+    if rank is None:
+        rank = min((_METRIC_RANKS[match.group(1)] for match in _METRIC_PATTERN.finditer(name)), default=len(ALL_METRICS_ORDER))
+    return rank, _SOFTWARE_PATTERN.search(name) is not None
+
 def sort_graphics_by_order(graphics: Dict[str, str]) -> List[Tuple[str, str]]:
-    """Sorts graphics by predefined order (utility)."""
-    sorted_graphics = []
-    remaining_graphics = list(graphics.items())
-    for metric_name in ALL_METRICS_ORDER:
-        matched_graphics = [(panel_name, path) for panel_name, path in remaining_graphics if metric_name in panel_name.lower()]
-        sorted_graphics.extend(matched_graphics)
-        for graphic in matched_graphics:
-            if graphic in remaining_graphics:
-                remaining_graphics.remove(graphic)
-    remaining_graphics.sort(key=lambda x: x[0].lower())
-    sorted_graphics.extend(remaining_graphics)
-    return sorted_graphics
+    """Sorts graphics by predefined order, unknown panels last by name (utility)."""
+    unknown = len(ALL_METRICS_ORDER)
+
+    def key(item: Tuple[str, str]) -> Tuple[int, str]:
+        rank = classify_panel(item[0])[0]
+        return rank, item[0].lower() if rank == unknown else ''
+
+    return sorted(graphics.items(), key=key)
 
 def categorize_graphics(graphics: Dict[str, Dict[str, str]]) -> Tuple[Dict, Dict]:
     """Categorizes graphics into system and software metrics (utility)."""
     system_metrics = {}
     software_metrics = {}
-    software_keywords = ['heap', 'metaspace', 'gc', 'jvm', 'thread', 'class', 'compilation']
     for container, container_graphics in graphics.items():
-        system_metrics[container] = {}
-        software_metrics[container] = {}
+        system = system_metrics[container] = {}
+        software = software_metrics[container] = {}
         for panel_name, screenshot_path in container_graphics.items():
-            if any(keyword in panel_name.lower() for keyword in software_keywords):
-                software_metrics[container][panel_name] = screenshot_path
-            else:
-                system_metrics[container][panel_name] = screenshot_path
-    return system_metrics, software_metrics
\ No newline at end of file
+            (software if classify_panel(panel_name)[1] else system)[panel_name] = screenshot_path
+    return system_metrics, software_metrics
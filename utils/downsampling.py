@@ -0,0 +1,116 @@
+# utils/downsampling.py
+"""
+Downsampling of (x, y) series on numpy arrays, so data pulled for a chart scales with its pixel width.
+
+- minmax(): min and max point per equal-width x bucket; keeps spikes, fully vectorized.
+- lttb(): Largest-Triangle-Three-Buckets; keeps the visual shape with exactly `threshold` points.
+- MinMaxAccumulator: minmax over a stream of chunks with memory bounded by the bucket count,
+  for raw series that are too long to hold at once; result() can finish with LTTB.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+
+def _finite(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    mask = np.isfinite(x) & np.isfinite(y)
+    return x[mask], y[mask]
+
+
+def _bucket_extremes(buckets: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Indices of the min and max y in every non-empty bucket (utility)."""
+    if len(buckets) and np.all(buckets[1:] >= buckets[:-1]):
+        # Time-ordered input (the usual case): segment reductions, no sort
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        counts = np.diff(np.r_[starts, len(y)])
+        lows = np.minimum.reduceat(y, starts)
+        highs = np.maximum.reduceat(y, starts)
+        low_index = np.flatnonzero(y == np.repeat(lows, counts))
+        high_index = np.flatnonzero(y == np.repeat(highs, counts))
+        # First position of the extreme within each segment
+        return buckets[starts], low_index[np.searchsorted(low_index, starts)], high_index[np.searchsorted(high_index, starts)]
+    order = np.lexsort((y, buckets))
+    sorted_buckets = buckets[order]
+    starts = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+    ends = np.r_[starts[1:], len(order)] - 1
+    return sorted_buckets[starts], order[starts], order[ends]
+
+
+def minmax(x, y, n_buckets: int, x_range: Tuple[float, float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Keeps the min and max point of each of n_buckets equal-width x buckets, in x order."""
+    x, y = _finite(x, y)
+    if len(x) <= 2 * n_buckets:
+        order = np.argsort(x, kind='stable')
+        return x[order], y[order]
+    low, high = x_range or (x.min(), x.max())
+    width = (high - low) / n_buckets or 1.0
+    buckets = np.clip(((x - low) / width).astype(np.int64), 0, n_buckets - 1)
+    _, low_index, high_index = _bucket_extremes(buckets, y)
+    keep = np.unique(np.concatenate([low_index, high_index]))
+    keep = keep[np.argsort(x[keep], kind='stable')]
+    return x[keep], y[keep]
+
+
+def lttb(x, y, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Largest-Triangle-Three-Buckets: threshold points that preserve the shape of a sorted series."""
+    x, y = _finite(x, y)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+    # First and last points are kept; the rest is split into threshold - 2 buckets
+    edges = 1 + np.arange(threshold - 1) * (n - 2) // (threshold - 2)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], (edges[i + 2] if i + 2 < len(edges) else n)
+        average_x = x[next_start:next_end].mean()
+        average_y = y[next_start:next_end].mean()
+        # Twice the triangle area (previous point, candidate, next bucket average); the constant factor does not matter
+        areas = np.abs((x[previous] - average_x) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (average_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+    return x[selected], y[selected]
+
+
+class MinMaxAccumulator:
+    """minmax() over chunks of a series: keeps one min and one max point per bucket of [start, end]."""
+
+    def __init__(self, start: float, end: float, n_buckets: int):
+        self.start = start
+        self.n_buckets = max(1, n_buckets)
+        self.width = (end - start) / self.n_buckets or 1.0
+        self.min_x = np.full(self.n_buckets, np.nan)
+        self.min_y = np.full(self.n_buckets, np.inf)
+        self.max_x = np.full(self.n_buckets, np.nan)
+        self.max_y = np.full(self.n_buckets, -np.inf)
+        self.points = 0
+
+    def add(self, x, y):
+        x, y = _finite(x, y)
+        if not len(x):
+            return
+        self.points += len(x)
+        buckets = np.clip(((x - self.start) / self.width).astype(np.int64), 0, self.n_buckets - 1)
+        index, low_index, high_index = _bucket_extremes(buckets, y)
+        lower = y[low_index] < self.min_y[index]
+        self.min_y[index[lower]] = y[low_index[lower]]
+        self.min_x[index[lower]] = x[low_index[lower]]
+        higher = y[high_index] > self.max_y[index]
+        self.max_y[index[higher]] = y[high_index[higher]]
+        self.max_x[index[higher]] = x[high_index[higher]]
+
+    def result(self, threshold: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Collected points in x order, reduced further with lttb() to threshold points if given."""
+        x = np.concatenate([self.min_x, self.max_x])
+        y = np.concatenate([self.min_y, self.max_y])
+        x, y = _finite(x, y)
+        x, index = np.unique(x, return_index=True)
+        y = y[index]
+        return lttb(x, y, threshold) if threshold else (x, y)
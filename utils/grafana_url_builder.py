@@ -2,10 +2,11 @@
 
 import urllib.parse
 from utils.parse_utils import parse_date
-from config import config  # Inject config for dynamic params
 
-def build_grafana_url(namespace: str, panel_id: int, container: str, start_time: str, end_time: str, base_url: str) -> str:
-    """Builds Grafana URL (utility)."""
+def build_grafana_url(namespace: str, panel_id: int, container: str, start_time: str, end_time: str, base_url: str, config=None) -> str:
+    """Builds Grafana URL (utility). Dynamic params come from config, the global ConfigManager by default."""
+    if config is None:
+        from config import config
     parsed_url = urllib.parse.urlparse(base_url)
     query_params = urllib.parse.parse_qs(parsed_url.query)
     updated_params = {
@@ -0,0 +1,39 @@
+# utils/http_session.py
+
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Dict, Optional, Tuple
+from urllib3.util.retry import Retry
+
+
+def build_session(pool_size: int, headers: Optional[Dict[str, str]] = None, retries: Optional[Retry] = None,
+                  cert: Optional[Tuple[str, str]] = None, verify: bool = True) -> requests.Session:
+    """Builds a keep-alive session with a connection pool of pool_size per host (utility)."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(1, pool_size), max_retries=retries or 0)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    if headers:
+        session.headers.update(headers)
+    session.cert = cert
+    session.verify = verify
+    return session
+
+
+def connection_stats(session: requests.Session) -> Dict[str, int]:
+    """Counts requests and opened connections over the session's live pools (utility)."""
+    requests_count = 0
+    connections = 0
+    for adapter in set(session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            requests_count += pool.num_requests
+            connections += pool.num_connections
+    return {
+        'requests': requests_count,
+        'connections': connections,
+        'reused': max(0, requests_count - connections),
+    }
@@ -0,0 +1,121 @@
+# utils/panel_metrics.py
+
+import json
+from typing import Callable, Dict, List, Optional, Set
+
+# Panel slug -> InfluxDB measurement the panel is drawn from. Panels without an entry are always rendered.
+# A value is either a measurement name or a spec drawn by the native renderer the way Grafana draws the panel:
+#   {"measurement", "where", "group_by", "field", "kind", "scale", "sum_by", "label"} - one series: kind 'counter'
+#   is drawn as a per-second rate, 'gauge' as is; sum_by adds series split by these tags up (e.g. heap pools);
+#   scale multiplies the values (e.g. CPU seconds/s -> millicores); label names its lines in the legend;
+#   "also": [series spec, ...] - more series on the same panel (e.g. transmit next to receive);
+#   "native": false - the panel cannot be reproduced from one measurement (e.g. a percent of the limit),
+#   the native backend falls back to Grafana for it (Native_fallback).
+# Overridable with Influxdb_panel_measurements (JSON object of the same shape).
+PANEL_MEASUREMENTS = {
+    # usage / limit: a ratio of two measurements
+    'cpu-usage-percent': {'measurement': 'container_cpu_usage_seconds_total', 'kind': 'counter', 'native': False},
+    # CFS quota is in microseconds per period; the default 100ms period makes 1 millicore = 100us
+    'cpu-usage-limit-(millicores)': {'measurement': 'container_spec_cpu_quota', 'scale': 0.01},
+    'cpu-throttled-(millicores)': {'measurement': 'container_cpu_cfs_throttled_seconds_total', 'kind': 'counter', 'scale': 1000},
+    'ram-usage-percent': {'measurement': 'container_memory_working_set_bytes', 'native': False},
+    'ram-usage-limit-(bytes)': 'container_spec_memory_limit_bytes',
+    # available = limit - usage, not stored as a measurement
+    'disk-total-avail-used-(bytes)': {'measurement': 'container_fs_usage_bytes', 'native': False},
+    'disk-read-write-(bytes)': {
+        'measurement': 'container_fs_reads_bytes_total', 'kind': 'counter', 'sum_by': ['device'], 'label': 'read',
+        'also': [{'measurement': 'container_fs_writes_bytes_total', 'kind': 'counter', 'sum_by': ['device'], 'label': 'write'}],
+    },
+    'disk-read-write-(ops)': {
+        'measurement': 'container_fs_reads_total', 'kind': 'counter', 'sum_by': ['device'], 'label': 'read',
+        'also': [{'measurement': 'container_fs_writes_total', 'kind': 'counter', 'sum_by': ['device'], 'label': 'write'}],
+    },
+    'traffic-in-out-(bytes)': {
+        'measurement': 'container_network_receive_bytes_total', 'kind': 'counter', 'sum_by': ['interface'], 'label': 'in',
+        'also': [{'measurement': 'container_network_transmit_bytes_total', 'kind': 'counter', 'sum_by': ['interface'], 'label': 'out'}],
+    },
+    'heap-(bytes)': {'measurement': 'jvm_memory_used_bytes', 'where': {'area': 'heap'}, 'sum_by': ['id']},
+    'heap-per-pool-(bytes)': {'measurement': 'jvm_memory_used_bytes', 'where': {'area': 'heap'}, 'group_by': ['id']},
+    'nonHeap-per-pool-(bytes)': {'measurement': 'jvm_memory_used_bytes', 'where': {'area': 'nonheap'}, 'group_by': ['id']},
+    'metaspace-(bytes)': {'measurement': 'jvm_memory_used_bytes', 'where': {'id': 'Metaspace'}},
+    'gc-collection-count-time': {
+        'measurement': 'jvm_gc_pause_seconds_count', 'kind': 'counter', 'sum_by': ['action', 'cause', 'gc'], 'label': 'count',
+        'also': [{'measurement': 'jvm_gc_pause_seconds_sum', 'kind': 'counter', 'sum_by': ['action', 'cause', 'gc'], 'label': 'time'}],
+    },
+    'threads-count': 'jvm_threads_live_threads',
+}
+
+
+def series_spec(value) -> Dict:
+    """Normalizes one series of a mapping value to
+    {'measurement', 'where', 'group_by', 'field', 'kind', 'scale', 'sum_by', 'label'} (utility)."""
+    if isinstance(value, str):
+        value = {'measurement': value}
+    return {
+        'measurement': value['measurement'], 'where': dict(value.get('where') or {}), 'group_by': list(value.get('group_by') or []),
+        'field': value.get('field', 'value'), 'kind': value.get('kind', 'gauge'), 'scale': float(value.get('scale', 1)),
+        'sum_by': list(value.get('sum_by') or []), 'label': value.get('label', ''),
+    }
+
+
+def panel_spec(value) -> Dict:
+    """Normalizes a mapping value to the first series spec plus 'series' (all of them) and 'native' (utility)."""
+    options = value if isinstance(value, dict) else {}
+    spec = series_spec(value)
+    spec.update(series=[series_spec(value)] + [series_spec(item) for item in options.get('also') or []],
+                native=bool(options.get('native', True)))
+    return spec
+
+
+def panel_specs(config_manager) -> Dict[str, Dict]:
+    """Panel -> query spec mapping, Influxdb_panel_measurements if set (utility)."""
+    override = config_manager.get_value('Influxdb_panel_measurements', '')
+    mapping = json.loads(override) if override else PANEL_MEASUREMENTS
+    return {graphic_name: panel_spec(value) for graphic_name, value in mapping.items()}
+
+
+def panel_measurements(config_manager) -> Dict[str, str]:
+    """Panel -> measurement name mapping (utility)."""
+    return {graphic_name: spec['measurement'] for graphic_name, spec in panel_specs(config_manager).items()}
+
+
+def has_data_filter(available: Optional[Dict[str, Set[str]]], measurements: Dict[str, str]) -> Optional[Callable[[str, str], bool]]:
+    """Builds has_data(container, graphic_name) from {container: measurements with points} (utility).
+
+    None (the pre-check failed or is disabled) means every panel is rendered. A measurement without
+    points for any container of the namespace is treated as unknown (e.g. a mapping that does not match
+    the schema) and its panels are rendered too, so a wrong mapping never empties a report.
+    """
+    if available is None:
+        return None
+    seen = set().union(*available.values()) if available else set()
+
+    def has_data(container: str, graphic_name: str) -> bool:
+        measurement = measurements.get(graphic_name)
+        return measurement is None or measurement not in seen or measurement in available.get(container, ())
+
+    return has_data
+
+
+# Per-container summary table: (key, title, spec). kind 'counter' is reported as a per-second rate,
+# 'gauge' as is; sum_by adds series split by these tags up (e.g. heap pools) before aggregating;
+# scale multiplies the result (e.g. CPU seconds/s -> millicores). Overridable with Influxdb_summary_metrics
+# (JSON list of {"key", "title", "measurement", ...}).
+SUMMARY_METRICS = [
+    {'key': 'cpu', 'title': 'CPU (millicores)', 'measurement': 'container_cpu_usage_seconds_total', 'kind': 'counter', 'scale': 1000},
+    {'key': 'throttling', 'title': 'CPU throttled (millicores)', 'measurement': 'container_cpu_cfs_throttled_seconds_total', 'kind': 'counter', 'scale': 1000},
+    {'key': 'ram', 'title': 'RAM', 'measurement': 'container_memory_working_set_bytes', 'unit': 'bytes'},
+    {'key': 'heap', 'title': 'Heap', 'measurement': 'jvm_memory_used_bytes', 'where': {'area': 'heap'}, 'sum_by': ['id'], 'unit': 'bytes'},
+    {'key': 'gc', 'title': 'GC time (ms/s)', 'measurement': 'jvm_gc_pause_seconds_sum', 'kind': 'counter', 'sum_by': ['action', 'cause', 'gc'], 'scale': 1000},
+]
+
+
+def summary_metrics(config_manager) -> List[Dict]:
+    """Normalized summary metric specs, Influxdb_summary_metrics if set (utility)."""
+    override = config_manager.get_value('Influxdb_summary_metrics', '')
+    metrics = []
+    for value in (json.loads(override) if override else SUMMARY_METRICS):
+        metric = series_spec(value)
+        metric.update(key=value['key'], title=value.get('title') or value['key'], unit=value.get('unit', ''))
+        metrics.append(metric)
+    return metrics
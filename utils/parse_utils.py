@@ -1,5 +1,7 @@
 # utils/parse_utils.py
 
+import re
+import time
 from datetime import datetime
 
 def parse_date(date_to_parse: str):
@@ -13,4 +15,32 @@ def parse_date(date_to_parse: str):
             return date_to_parse
         return '{}000'.format(
             int(datetime.strptime(date_to_parse, '%d.%m.%Y %H:%M').timestamp())
-        )
\ No newline at end of file
+        )
+
+def to_influx_time(date_to_parse: str) -> str:
+    """
+    Переводит дату (формат GUI, epoch ms или now-…) в выражение времени InfluxQL.
+    """
+    value = parse_date(date_to_parse).split('/')[0]  # Округление Grafana (now-1d/d) InfluxQL не поддерживает
+    if value.startswith('now'):
+        offset = value[len('now'):]
+        return f"now() {offset[0]} {offset[1:]}" if offset else "now()"
+    return f"{value}ms"
+
+_UNIT_SECONDS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800, 'M': 2592000, 'y': 31536000}
+
+def to_epoch_ms(date_to_parse: str, now_ms: int = None) -> int:
+    """
+    Переводит дату (формат GUI, epoch ms или now-…) в epoch ms.
+    """
+    value = parse_date(date_to_parse).split('/')[0]
+    if not value.startswith('now'):
+        return int(value)
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    match = re.fullmatch(r'now(?:([+-])(\d+)([smhdwMy]))?', value.replace(' ', ''))
+    if not match:
+        raise ValueError(f"Unsupported relative time: {date_to_parse}")
+    if not match.group(1):
+        return now_ms
+    offset = int(match.group(2)) * _UNIT_SECONDS[match.group(3)] * 1000
+    return now_ms - offset if match.group(1) == '-' else now_ms + offset
@@ -0,0 +1,113 @@
+# utils/report_templates.py
+"""
+Report page templates (resources/test_templates/<name>.txt), compiled once into literal and slot segments.
+
+Slots are written as {{name}}; the legacy markers are aliases:
+    TOCHANGEFROMPYTHONEXPORTER     -> {{content}}
+    PUTTABLECONFHEREPYTHONEXPORTER -> {{config_table}}
+Compiled templates are shared by every run of the process and recompiled when the file changes (mtime/size).
+"""
+
+import io
+import os
+import re
+import threading
+import logging
+from typing import Any, Callable, Dict, List, TextIO, Tuple, Union
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# Имя теста в GUI -> шаблон
+TEST_TEMPLATES = {
+    'Поиск максимума': 'maxperf',
+    'Подтверждение максимума': 'confirm_maxperf',
+    'Стабильность': 'stability',
+}
+
+LEGACY_SLOTS = {
+    'TOCHANGEFROMPYTHONEXPORTER': 'content',
+    'PUTTABLECONFHEREPYTHONEXPORTER': 'config_table',
+}
+
+_SLOT_PATTERN = re.compile(
+    '|'.join(re.escape(marker) for marker in LEGACY_SLOTS) + r'|\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}'
+)
+
+# Slot value: text written as is, or a function writing into the output buffer
+SlotValue = Union[str, Callable[[TextIO], Any]]
+
+
+class CompiledTemplate:
+    """A template split into literals and slots: literals[0] slots[0] literals[1] ... literals[-1]."""
+
+    def __init__(self, text: str):
+        self.literals: List[str] = []
+        self.slots: List[str] = []
+        position = 0
+        for match in _SLOT_PATTERN.finditer(text):
+            self.literals.append(text[position:match.start()])
+            self.slots.append(match.group(1) or LEGACY_SLOTS[match.group(0)])
+            position = match.end()
+        self.literals.append(text[position:])
+        self.slot_names = frozenset(self.slots)
+
+    def has_slot(self, name: str) -> bool:
+        return name in self.slot_names
+
+    def write(self, out: TextIO, values: Dict[str, SlotValue]):
+        """Writes the template with slots filled from values; missing slots are left empty."""
+        for literal, slot in zip(self.literals, self.slots):
+            out.write(literal)
+            value = values.get(slot)
+            if callable(value):
+                value(out)
+            elif value:
+                out.write(value)
+        out.write(self.literals[-1])
+
+    def render(self, values: Dict[str, SlotValue]) -> str:
+        out = io.StringIO()
+        self.write(out, values)
+        return out.getvalue()
+
+
+# path -> ((mtime_ns, size), compiled template), shared by every registry
+_compiled: Dict[str, Tuple[Tuple[int, int], CompiledTemplate]] = {}
+_compiled_lock = threading.Lock()
+
+
+class TemplateRegistry:
+    """Compiled report templates of one directory, looked up by template or GUI test name."""
+
+    def __init__(self, directory: str = './resources/test_templates'):
+        self.directory = directory
+
+    def template_name(self, test_name: str) -> str:
+        """Template key for a GUI test name (or a template key itself)."""
+        name = TEST_TEMPLATES.get(test_name, test_name)
+        if not name or name not in TEST_TEMPLATES.values() and not os.path.exists(self.path(name)):
+            raise ValueError(f"Unknown test: {test_name}")
+        return name
+
+    def path(self, name: str) -> str:
+        return os.path.abspath(os.path.join(self.directory, f"{name}.txt"))
+
+    def get(self, test_name: str) -> CompiledTemplate:
+        """Compiled template, re-read only if the file changed since it was compiled."""
+        path = self.path(self.template_name(test_name))
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Template not found: {path}") from None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with _compiled_lock:
+            cached = _compiled.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        with open(path, "r", encoding="utf-8") as file:
+            template = CompiledTemplate(file.read())
+        logger.info(f"Compiled template {path}: {len(template.slots)} slots")
+        with _compiled_lock:
+            _compiled[path] = (signature, template)
+        return template
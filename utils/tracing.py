@@ -0,0 +1,139 @@
+# utils/tracing.py
+"""
+Spans for the report pipeline: stages, renders with their retries and waits, uploads and page calls.
+
+A run's spans export as Chrome trace JSON (open in chrome://tracing or https://ui.perfetto.dev)
+and as a summary of time per stage and per external host.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+
+def host_of(url: str) -> str:
+    """host[:port] of a URL, as used to group external calls (utility)."""
+    return urlparse(url).netloc or url
+
+
+def _track_id() -> int:
+    # Coroutines share one thread, so each asyncio task gets a track of its own
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return id(task) if task is not None else threading.get_ident()
+
+
+class Tracer:
+    """Collects spans of one report run; Tracer(enabled=False) records nothing."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.spans: List[Dict] = []
+        self._tracks: Dict[int, tuple] = {}
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, category: str = 'stage', host: Optional[str] = None, **args):
+        """Records the time spent inside the block; args are shown with the span in the trace viewer."""
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException as error:
+            args['error'] = type(error).__name__
+            raise
+        finally:
+            self.add(name, category, started, time.perf_counter() - started, host, **args)
+
+    def add(self, name: str, category: str, started: float, duration: float, host: Optional[str] = None, **args):
+        """Records a span measured elsewhere (started is a time.perf_counter() value)."""
+        if not self.enabled:
+            return
+        track = _track_id()
+        with self._lock:
+            if track not in self._tracks:
+                self._tracks[track] = (len(self._tracks) + 1, self._track_name())
+            self.spans.append({
+                'name': name, 'category': category, 'host': host, 'args': args,
+                'start': started - self._origin, 'duration': duration, 'tid': self._tracks[track][0],
+            })
+
+    @staticmethod
+    def _track_name() -> str:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        return task.get_name() if task is not None else threading.current_thread().name
+
+    def to_chrome_trace(self) -> Dict:
+        """Spans as Chrome trace events (complete 'X' events, microseconds)."""
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+            tracks = list(self._tracks.values())
+        events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}} for tid, name in tracks]
+        for span in spans:
+            args = dict(span['args'])
+            if span['host']:
+                args['host'] = span['host']
+            events.append({
+                'name': span['name'], 'cat': span['category'], 'ph': 'X', 'pid': pid, 'tid': span['tid'],
+                'ts': round(span['start'] * 1e6, 1), 'dur': round(span['duration'] * 1e6, 1), 'args': args,
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export(self, path: str) -> str:
+        """Writes the Chrome trace JSON file and returns its path."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_chrome_trace(), file, ensure_ascii=False)
+        return path
+
+    def summary(self) -> Dict[str, Dict[str, Dict]]:
+        """Totals per stage ("category/name") and per external host: count, total_s, max_s.
+
+        Spans run in parallel, so totals of render/upload spans can exceed the wall time.
+        """
+        stages = defaultdict(lambda: {'count': 0, 'total_s': 0.0, 'max_s': 0.0})
+        hosts = defaultdict(lambda: {'count': 0, 'total_s': 0.0, 'max_s': 0.0})
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            groups = [stages[f"{span['category']}/{span['name']}"]]
+            if span['host'] and span['category'] == 'http':
+                groups.append(hosts[span['host']])
+            for group in groups:
+                group['count'] += 1
+                group['total_s'] += span['duration']
+                group['max_s'] = max(group['max_s'], span['duration'])
+        rounded = lambda totals: {key: {**value, 'total_s': round(value['total_s'], 3), 'max_s': round(value['max_s'], 3)}
+                                  for key, value in sorted(totals.items())}
+        return {'stages': rounded(stages), 'hosts': rounded(hosts)}
+
+    def format_summary(self) -> str:
+        """The summary as a plain-text table for logs."""
+        summary = self.summary()
+        lines = []
+        for title in ('stages', 'hosts'):
+            lines.append(f"{title[:-1]:<44} {'count':>7} {'total s':>10} {'max s':>8}")
+            for key, value in summary[title].items():
+                lines.append(f"{key:<44} {value['count']:>7} {value['total_s']:>10.3f} {value['max_s']:>8.3f}")
+        return "\n".join(lines)
+
+
+# Default for services used outside a traced run
+NULL_TRACER = Tracer(enabled=False)
@@ -0,0 +1,48 @@
+# workers/batch_runner.py
+import time
+import logging
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from workers.report_pipeline import ReportPipeline
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+class BatchReportRunner:
+    """Runs report jobs for several namespaces over one set of shared service clients.
+
+    A job is the same dict ProcessingWorker receives from the GUI: fp_code, from_dt/to_dt
+    and the page target (page_id in append mode, otherwise space/parent_id/page_name).
+    All jobs share one render service, so Grafana_max_workers (Grafana_async_concurrency with
+    the async backend) is the global render budget and it is split evenly between the
+    namespaces rendering at the same time.
+    """
+
+    def __init__(self, config_manager, max_parallel_jobs: Optional[int] = None):
+        self.pipeline = ReportPipeline(config_manager)
+        self.max_parallel_jobs = max_parallel_jobs or int(config_manager.get_value('Batch_max_parallel_jobs', '4'))
+
+    def run_job(self, job: Dict, on_progress: Optional[Callable[[str, int], None]] = None) -> Dict:
+        """Runs one job; never raises, errors are reported in the result."""
+        fp_code = job.get('fp_code')
+        started = time.perf_counter()
+        result = {'fp_code': fp_code, 'success': False, 'page_id': None, 'timings': {}, 'trace_file': None, 'error': None}
+        try:
+            report = self.pipeline.run(job, lambda value: on_progress(fp_code, value) if on_progress else None)
+            result.update(success=report['success'], page_id=report['page_id'], timings=report['timings'], trace_file=report['trace_file'])
+        except Exception as error:
+            logger.error(f"Batch job {fp_code} failed: {error}")
+            result['error'] = traceback.format_exc()
+        result['elapsed'] = round(time.perf_counter() - started, 3)
+        return result
+
+    def run(self, jobs: List[Dict], on_progress: Optional[Callable[[str, int], None]] = None) -> List[Dict]:
+        """Runs all jobs concurrently and returns per-job results in job order."""
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_parallel_jobs, len(jobs) or 1)), thread_name_prefix='batch-job') as executor:
+            return list(executor.map(lambda job: self.run_job(job, on_progress), jobs))
+
+    def close(self):
+        self.pipeline.close()
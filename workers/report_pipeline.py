@@ -0,0 +1,262 @@
+# workers/report_pipeline.py
+import os
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from html import escape
+from typing import Callable, Dict, Optional
+
+from service.influx_query_service import InfluxQueryService
+from service.grafana_services.grafana_sceernshot_service import GrafanaScreenshotService
+from service.confluence_services.confluence_page_service import ConfluencePageService
+from service.confluence_services.confluence_attachment_service import ConfluenceAttachmentService
+from service.confluence_services.attachment_upload_pipeline import AttachmentUploadPipeline
+from utils.confluence_content_builder import get_table_from_page, section_key, write_metrics_category_macro, write_summary_table, write_xml_table
+from utils.confluence_graphics_sorter import categorize_graphics, sort_graphics_by_order
+from utils.panel_metrics import has_data_filter, panel_measurements, summary_metrics
+from utils.parse_utils import to_epoch_ms
+from utils.report_templates import TemplateRegistry
+from utils.tracing import Tracer, host_of
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def create_grafana_service(config_manager, influx_service: Optional[InfluxQueryService] = None) -> GrafanaScreenshotService:
+    """Builds the screenshot service for the configured Grafana_render_backend (threads, async or native)."""
+    backend = config_manager.get_value('Grafana_render_backend', 'threads')
+    if backend == 'async':
+        from service.grafana_services.grafana_async_screenshot_service import AsyncGrafanaScreenshotService
+        return AsyncGrafanaScreenshotService(config_manager)
+    if backend == 'native':
+        from service.chart_services.native_chart_service import NativeChartService
+        return NativeChartService(config_manager, influx_service)
+    return GrafanaScreenshotService(config_manager)
+
+
+class StreamProgress:
+    """Maps render and upload completions of the streaming pipeline onto a progress range."""
+
+    def __init__(self, emit: Callable[[int], None], start: int, end: int):
+        self.emit = emit
+        self.start = start
+        self.end = end
+        self.total = 0
+        self.completed = 0
+        self.last = start
+        self._lock = threading.Lock()
+
+    def rendered(self, success: bool, total: int):
+        # A failed render will never be uploaded, so it finishes both of its steps at once
+        self._advance(1 if success else 2, total)
+
+    def uploaded(self):
+        self._advance(1)
+
+    def _advance(self, steps: int, total: int = None):
+        with self._lock:
+            if total is not None:
+                self.total = total
+            self.completed += steps
+            if not self.total:
+                return
+            value = self.start + (self.end - self.start) * self.completed // (2 * self.total)
+            if value <= self.last:
+                return
+            self.last = value
+        self.emit(value)
+
+
+class ReportPipeline:
+    """Influx → Grafana → Confluence report flow without Qt.
+
+    Service clients are created once and may be shared by concurrent runs (see BatchReportRunner).
+    """
+
+    def __init__(self, config_manager, influx_service=None, grafana_service=None, page_service=None, attachment_service=None):
+        self.config = config_manager
+        self.influx_service = influx_service or InfluxQueryService(config_manager)
+        self.grafana_service = grafana_service or create_grafana_service(config_manager, self.influx_service)
+        self.page_service = page_service or ConfluencePageService(config_manager)
+        self.attachment_service = attachment_service or ConfluenceAttachmentService(config_manager)
+        self.templates = TemplateRegistry(config_manager.get_value('Report_templates_dir', './resources/test_templates'))
+
+    def run(self, params: Dict, on_progress: Optional[Callable[[int], None]] = None) -> Dict:
+        """Builds and publishes one report.
+
+        Returns {'success', 'page_id', 'graphics', 'timings', 'trace_summary', 'trace_file'} where timings
+        maps stage -> seconds. Spans of the run are written to Trace_dir as Chrome trace JSON, also on failure.
+        """
+        trace_dir = self.config.get_value('Trace_dir', './traces')
+        tracer = Tracer(enabled=bool(trace_dir))
+        try:
+            report = self._run(params, on_progress, tracer)
+        finally:
+            trace_file = self._export_trace(tracer, trace_dir, params.get('fp_code'))
+        report.update(trace_summary=tracer.summary(), trace_file=trace_file)
+        return report
+
+    def _export_trace(self, tracer: Tracer, trace_dir: str, fp_code: Optional[str]) -> Optional[str]:
+        """Writes the run's trace file and logs the per-stage/per-host summary (internal)."""
+        if not tracer.enabled:
+            return None
+        path = os.path.join(trace_dir, f"{fp_code or 'report'}-{time.strftime('%Y%m%d-%H%M%S')}-{threading.get_ident()}.json")
+        try:
+            tracer.export(path)
+        except OSError as error:
+            logger.warning(f"Could not write trace {path}: {error}")
+            path = None
+        logger.info(f"Report {fp_code} trace: {path}\n{tracer.format_summary()}")
+        return path
+
+    def _run(self, params: Dict, on_progress: Optional[Callable[[int], None]], tracer: Tracer) -> Dict:
+        emit = on_progress or (lambda value: None)
+        timings = {}
+        influx_host = f"{self.config.get_value('Influxdb_url')}:{self.config.get_value('Influxdb_port')}"
+        confluence_host = host_of(self.config.get_value('Confluence_url'))
+
+        @contextmanager
+        def stage(name: str):
+            started = time.perf_counter()
+            try:
+                with tracer.span(name):
+                    yield
+            finally:
+                timings[name] = round(time.perf_counter() - started, 3)
+
+        fp_code = params.get('fp_code')  # e.g., "VAT"
+        namespace = fp_code.lower()  # Assume lowercase for queries
+        start_time = params.get('from_dt')
+        end_time = params.get('to_dt')
+        page_name = params.get('page_name')
+        append_mode = params.get('append_mode')
+        test_name = params.get('test_name')
+        # summary_only: numeric summary table without screenshots, for a fast turnaround
+        summary_only = params.get('summary_only')
+        if summary_only is None:
+            summary_only = self.config.get_value('Report_summary_only', 'false').lower() == 'true'
+        logger.info(f"Report {fp_code}: {test_name}, {start_time} - {end_time}")
+
+        # Compiled once per process and file version (utils.report_templates)
+        template = self.templates.get(test_name)
+
+        # Step 0: Determine/create page_id
+        with stage('page_setup'):
+            if append_mode:
+                page_id = params.get('page_id')
+                with tracer.span('GET page', 'http', confluence_host):
+                    page_exists = self.page_service.page_exists(page_id)
+                if not page_exists:
+                    raise ValueError("Page ID does not exist for append mode.")
+            else:
+                space = params.get('space')
+                parent_id = params.get('parent_id')
+                with tracer.span('POST page', 'http', confluence_host):
+                    page_id = self.page_service.create_new_page(space, page_name, parent_id)
+                if not page_id:
+                    raise ValueError("Failed to create new page.")
+        emit(5)  # After page setup
+
+        # Step 1: Get containers
+        with stage('containers'):
+            with tracer.span('SHOW TAG VALUES', 'http', influx_host):
+                containers = self.influx_service.get_containers(namespace, start_time, end_time)
+
+        # Step 1a: One bulk query for which panels have data, so empty "No data" panels are not rendered
+        has_data = None
+        if not summary_only and self.config.get_value('Influxdb_data_precheck', 'true').lower() == 'true':
+            with stage('data_check'):
+                measurements = panel_measurements(self.config)
+                with tracer.span('SELECT count', 'http', influx_host):
+                    available = self.influx_service.get_measurements_with_data(namespace, measurements.values(), start_time, end_time)
+                has_data = has_data_filter(available, measurements)
+
+        # Step 1b: Per-container max/p95/mean of the key metrics, a few aggregating queries in one request
+        summary, metrics = None, []
+        if summary_only or self.config.get_value('Report_summary', 'true').lower() == 'true':
+            with stage('summary'):
+                metrics = summary_metrics(self.config)
+                with tracer.span('SELECT summary', 'http', influx_host):
+                    summary = self.influx_service.get_container_summary(
+                        namespace, metrics, start_time, end_time, int(self.config.get_value('Influxdb_summary_interval', '30')))
+                if summary:
+                    summary = {c: summary[c] for c in containers if c in summary} or summary
+        emit(10)
+
+        # Step 2: Make screenshots, streaming each finished one to the upload queue
+        progress = StreamProgress(emit, 10, 90)
+        uploader = AttachmentUploadPipeline(
+            self.attachment_service, page_id,
+            workers=self.attachment_service.upload_workers,
+            queue_size=int(self.config.get_value('Confluence_upload_queue_size', '50')),
+            on_uploaded=lambda filepath, status: progress.uploaded(),
+            tracer=tracer,
+        )
+
+        def on_rendered(container, graphic_name, filepath, done, total):
+            progress.rendered(filepath is not None, total)
+            if filepath:
+                uploader.submit(filepath)
+
+        render_started = time.perf_counter()
+        try:
+            with stage('render'):
+                if summary_only:
+                    graphics = {}
+                else:
+                    graphics = self.grafana_service.make_screenshots(containers, start_time, end_time, namespace, on_result=on_rendered, tracer=tracer, has_data=has_data)
+
+            # Step 3: Categorize graphics (uploads keep running)
+            with stage('build'):
+                system_metrics, software_metrics = categorize_graphics(graphics)
+
+                with tracer.span('GET config page', 'http', confluence_host):
+                    table_rows = get_table_from_page(self.page_service.confluence, self.config.get_value('Confluence_page_id_conf'), namespace,
+                                                     self.config.get_value('Confluence_cache_dir', './.render_cache'))
+
+                # Step 4: Build content, written straight into the template's slots
+                # A template with its own {{summary_table}} slot places the summary itself
+                summary_in_content = summary and not template.has_slot('summary_table')
+
+                def write_content(out):
+                    if summary_in_content:
+                        write_summary_table(out, summary, metrics)
+                    if system_metrics:
+                        write_metrics_category_macro(out, "Системные метрики", system_metrics, sort_graphics_by_order)
+                    if software_metrics:
+                        write_metrics_category_macro(out, "Программные метрики", software_metrics, sort_graphics_by_order)
+
+                final_content = template.render({
+                    'content': write_content,
+                    'config_table': lambda out: write_xml_table(out, table_rows),
+                    'summary_table': (lambda out: write_summary_table(out, summary, metrics)) if summary else '',
+                    'fp_code': escape(fp_code),
+                    'test_name': escape(test_name or ''),
+                    'from': escape(start_time or ''),
+                    'to': escape(end_time or ''),
+                    'page_name': escape(page_name or ''),
+                    'generated_at': time.strftime('%d.%m.%Y %H:%M'),
+                })
+        finally:
+            # Step 5: Wait for the remaining attachment uploads
+            with tracer.span('upload_drain'):
+                uploader.close()
+            timings['render_and_upload'] = round(time.perf_counter() - render_started, 3)
+            tracer.add('render_and_upload', 'stage', render_started, time.perf_counter() - render_started)
+        emit(90)
+
+        # Step 6: Update/append page
+        with stage('page_update'):
+            with tracer.span('PUT page', 'http', confluence_host):
+                # Only this run's section is replaced, so re-running a fixed window does not duplicate it
+                # (relative windows resolve to the current time and always add a section)
+                key = section_key(namespace, test_name, to_epoch_ms(start_time), to_epoch_ms(end_time))
+                success = self.page_service.update_section(page_id, page_name, key, final_content)
+        emit(100)
+
+        return {'success': success, 'page_id': page_id, 'graphics': graphics, 'timings': timings}
+
+    def close(self):
+        """Releases pooled render resources."""
+        self.grafana_service.close()